@@ -6,40 +6,63 @@ import time
 from joppy.api import Api
 import requests
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
-from driver import driver
+from driver import API_PORT, API_SETUP, API_TOKEN, driver, wait_until_loaded
 import menu
 
-# Wait until an element has loaded to continue.
-WebDriverWait(driver, 10).until(
-    EC.presence_of_element_located((By.CLASS_NAME, "rli-sideBar"))
-)
-
-# activate the api if not already done
-menu.top(["Tools", "Options"])
-web_clipper_tab = driver.find_element(By.XPATH, "//a/span[text()='Web Clipper']")
-web_clipper_tab.click()
-api = Api(driver.find_element(By.XPATH, "//span[string-length(text())=128]").text)
-
-# avoid any language specific locators
-buttons = driver.find_elements(By.TAG_NAME, "button")
-try:
-    api.ping()
-except requests.exceptions.ConnectionError:
-    buttons[0].click()  # activate button
-
-# try three times until the API is available
-for i in range(3):
+
+def wait_until_available(
+    timeout: float = 0.3, initial_delay: float = 0.02, max_delay: float = 1.0
+):
+    """Ping the API with exponential backoff until it's available."""
+    mustend = time.time() + timeout
+    delay = initial_delay
+    try_ = 1
+    while True:
+        try:
+            logging.debug(f"API: ping, try {try_}")
+            api.ping()
+            break
+        except requests.exceptions.ConnectionError:
+            remaining = mustend - time.time()
+            if remaining <= 0:
+                raise
+            # try another time
+            time.sleep(min(delay, remaining))
+            delay = min(2 * delay, max_delay)
+            try_ += 1
+    logging.debug("API: ping successful")
+
+
+wait_until_loaded()
+
+api = Api(API_TOKEN, url=f"http://localhost:{API_PORT}")
+if API_SETUP == "settings":
+    # The API was activated by the settings file. Don't touch the UI.
+    try:
+        wait_until_available(timeout=10)
+        api.get_notebooks(limit=1)  # check the token
+    except requests.exceptions.RequestException as error:
+        logging.warning(f"API: activation by settings failed ({error}). Use the UI.")
+        API_SETUP = "ui"
+
+if API_SETUP == "ui":
+    # activate the api if not already done
+    menu.top(["Tools", "Options"])
+    web_clipper_tab = driver.find_element(By.XPATH, "//a/span[text()='Web Clipper']")
+    web_clipper_tab.click()
+    api = Api(
+        driver.find_element(By.XPATH, "//span[string-length(text())=128]").text,
+        url=f"http://localhost:{API_PORT}",
+    )
+
+    # avoid any language specific locators
+    buttons = driver.find_elements(By.TAG_NAME, "button")
     try:
-        logging.debug(f"API: ping, try {i + 1}")
         api.ping()
-        break
     except requests.exceptions.ConnectionError:
-        # try another time
-        time.sleep(0.1)
-api.ping()
-logging.debug("API: ping successful")
+        buttons[0].click()  # activate button
+
+    wait_until_available()
 
-buttons[-1].click()  # back button
+    buttons[-1].click()  # back button
@@ -4,28 +4,71 @@ from datetime import datetime
 import functools
 import logging
 import os
-import random
 import time
 from typing import List, Optional
 import unittest
 
-from PIL import ImageGrab
-
-# Only import pyautogui now, because it uses the DISPLAY variable.
-# It is set when starting xvfb.
-# https://pynput.readthedocs.io/en/latest/limitations.html?highlight=display#linux
-# It is needed to navigate through the menus, since they seem to be system level,
-# which can't be handled by selenium.
-import pyautogui
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
-from api import api
-from driver import driver
+from api import api, wait_until_available
+from browserlog import LogCollector
+import capture
+import cdp
+import dom
+from driver import (
+    driver,
+    execute_cdp,
+    execute_script,
+    PROFILE_DIR,
+    press_in_page,
+    restart_session,
+)
+from history import DurationHistory
+import inputs
+import listdom
+from locators import LocatorCache
 import menu
+import profiling
+from mirror import StateMirror
+import recording
+import seeding
+import text_entry
+from snapshot import ProfileSnapshot
+import wait
+
+
+# Collect the test durations to balance the workers of the next test runs.
+history = (
+    DurationHistory(os.environ["TEST_HISTORY_DB"])
+    if "TEST_HISTORY_DB" in os.environ
+    else None
+)
+
+# How to reset the app state after each test class:
+# - "api": Delete all notebooks via API.
+# - "snapshot": Restore a snapshot of the pristine profile and restart the app.
+RESET = os.getenv("TEST_RESET", "api")
+pristine_profile = ProfileSnapshot(PROFILE_DIR, f"{PROFILE_DIR}.snapshot")
+
+# Wrap the primitives of the tests to see where the time goes.
+if profiling.enabled():
+    profiling.instrument(driver, api)
+    profiling.patch_all(inputs, ("press", "hotkey", "click"), "input")
+    profiling.patch_all(menu, ("top", "choose_entry"), "menu")
+    profiling.patch_all(wait, ("wait_for_element",), "wait")
+    profiling.patch_all(capture, ("capture_app", "capture_screen"), "capture")
+    profiling.patch_all(seeding, ("seed",), "seeding")
+    profiling.patch(
+        cdp.CdpSession, "send", "cdp", name=lambda self, method, *_: method
+    )
+
+# Elements are shared by all test classes. They are located again when needed.
+locator_cache = LocatorCache(driver)
+
+# Drain the browser logs continuously, so that each test gets only its own entries.
+log_collector = LogCollector(driver)
+log_collector.start()
 
 
 def run_again_at_failure(func):
@@ -42,7 +85,7 @@ def run_again_at_failure(func):
             message = f"{func.__name__}: first run failed! Repeat once..."
             logging.warning(message)
             print(message)
-            pyautogui.click()  # focus the window
+            inputs.click()  # focus the window
             func(self, *args, **kwargs)
 
     return wrapper
@@ -73,106 +116,126 @@ class Test(unittest.TestCase):
         cls.api = api
         cls.driver = driver
 
-        # Each test class should have at least one notebook and one note.
-        cls.api.add_notebook(title=cls.__name__)
-        cls.api.add_note(title=cls.__name__)
+        if RESET == "snapshot" and not pristine_profile.taken:
+            pristine_profile.take()
+
+        cls.seeded = seeding.seed(cls.api, cls.fixture())
+        cls.mirror = StateMirror(cls.api)
 
         # cache common elements that shouldn't change
-        cls.sidebar = cls.find_element_present(
-            cls, By.CLASS_NAME, "rli-sideBar", timeout=10
-        )
-        cls.notebooks_title = cls.sidebar.find_element(
-            By.XPATH, "//div[@data-folder-id]"
+        cls.locators = locator_cache
+        cls.sidebar = cls.locators.find(By.CLASS_NAME, "rli-sideBar", timeout=10)
+        cls.notebooks_title = cls.locators.find(
+            By.XPATH, "//div[@data-folder-id]", scope=cls.sidebar
         )
 
-        cls.notelist = cls.driver.find_element(By.CLASS_NAME, "rli-noteList")
-        cls.editor = cls.driver.find_element(By.CLASS_NAME, "rli-editor")
+        cls.notelist = cls.locators.find(By.CLASS_NAME, "rli-noteList")
+        cls.editor = cls.locators.find(By.CLASS_NAME, "rli-editor")
+
+    @classmethod
+    def fixture(cls) -> seeding.FixtureSpec:
+        """Data to seed before the tests of a class are executed."""
+        # Each test class should have at least one notebook and one note.
+        return seeding.FixtureSpec(
+            notebooks=[
+                seeding.NotebookSpec(
+                    cls.__name__, notes=[seeding.NoteSpec(cls.__name__)]
+                )
+            ]
+        )
 
     @classmethod
     def tearDownClass(cls):
         super().tearDownClass()
 
         # Clear all notes at the end of the test class.
-        cls.api.delete_all_notebooks()
+        if RESET == "snapshot":
+            restart_session(while_stopped=pristine_profile.restore)
+            # The clipper server needs some time to start.
+            wait_until_available(timeout=10)
+        else:
+            cls.api.delete_all_notebooks()
+        # The located notes, notebooks and tags don't exist anymore.
+        cls.locators.invalidate()
 
     def setUp(self):
         super().setUp()
         logging.debug(f"Starting test {self.id()}")
         self.start_time = time.time()
+        self.start_perf = time.perf_counter()
+        log_collector.start_test(self.id())
 
     def tearDown(self):
         super().tearDown()
+        log_collector.end_test(self.id())
 
         # add the duration to each test
-        print(f"{time.time() - self.start_time:.3f} s, ", end="", flush=True)
+        duration = time.time() - self.start_time
+        print(f"{duration:.3f} s, ", end="", flush=True)
+        if history is not None:
+            history.record(self.id(), duration)
+
+        if profiling.enabled():
+            profiling.profiler.record("test", self.id(), self.start_perf, duration)
+            profiling.profiler.write_trace(f"{self.debug_dir}/trace/{self.id()}.json")
 
         if any(error for _, error in self._outcome.errors if error is not None):
             datestr = datetime.now().strftime("%Y_%m_%d_%H_%M_%S")
             base_name = f"{self.debug_dir}/{datestr}_{self.id()}"
 
-            # save screenshots of electron app and xvfb
-            self.driver.get_screenshot_as_file(f"{base_name}_webdriver.png")
-            ImageGrab.grab().save(f"{base_name}_xvfb.png", "PNG")
-            # save the browser log
-            with open(f"{base_name}_browser_log.txt", "w") as outfile:
-                log = self.driver.get_log("browser")
-                outfile.write("\n".join([str(line) for line in log]))
-
-        pyautogui.press("esc")  # close open dialog, if any
-
-    @staticmethod
-    def wait_for(
-        func,
-        *args,
-        timeout: int = 1,
-        interval: float = 0.1,
-        initial_delay: bool = False,
-        message: str = "",
-        **kwargs,
-    ):
-        # https://stackoverflow.com/a/2785908/7410886
-        mustend = time.time() + timeout
-        if not initial_delay:
-            if func(*args, **kwargs):
-                return
-        while time.time() < mustend:
-            if func(*args, **kwargs):
-                return
-            time.sleep(interval)
-        raise TimeoutError(message)
+            # save screenshots of electron app and xvfb and the browser log
+            # They are written in the background.
+            capture.capture_app(execute_cdp, base_name)
+            capture.capture_screen(base_name)
+            capture.pool.submit(log_collector.write, self.id(), base_name)
+            recording.keep_failure(self.id(), self.start_time, time.time())
+
+        # close open dialog, if any
+        # System level menus don't get the key of the page, so always press it
+        # at OS level. The page gets it additionally, if connected.
+        inputs.press("esc")
+        press_in_page("esc")
+
+    wait_for = staticmethod(wait.wait_for)
 
     def find_element_present(self, by_, locator, timeout: int = 1):
         """Find an element and wait until it's present."""
-        # https://stackoverflow.com/a/59130336/7410886
-        return WebDriverWait(self.driver, timeout).until(
-            EC.presence_of_element_located((by_, locator))
+        return wait.wait_for_element(
+            self.driver, by_, locator, condition="present", timeout=timeout
         )
 
     def find_element_visible(self, by_, locator, timeout: int = 1):
         """Find an element and wait until it's visible."""
-        return WebDriverWait(self.driver, timeout).until(
-            EC.visibility_of_element_located((by_, locator))
+        return wait.wait_for_element(
+            self.driver, by_, locator, condition="visible", timeout=timeout
         )
 
     def find_element_clickable(self, by_, locator, timeout: int = 1):
-        """Find an element and wait until it's visible."""
-        return WebDriverWait(self.driver, timeout).until(
-            EC.element_to_be_clickable((by_, locator))
+        """Find an element and wait until it's clickable."""
+        return wait.wait_for_element(
+            self.driver, by_, locator, condition="clickable", timeout=timeout
         )
 
     def assert_contains(self, container, element):
         """Assert that one element contains another."""
-        # TODO: Is there a better way?
-        self.assertNotEqual(element.get_attribute("outerHTML").strip(), "")
-        self.assertIn(
-            element.get_attribute("outerHTML"), container.get_attribute("outerHTML")
-        )
+        result, description = dom.contains(self.driver, container, element)
+        self.assertTrue(result, description)
+
+    def assert_focus_within(self, container):
+        """Assert that the focussed element is the container or inside of it."""
+        result, description = dom.focus_within(self.driver, container)
+        self.assertTrue(result, description)
 
     def is_focussed(self, element) -> bool:
         """Check if an element is in focus."""
         # https://stackoverflow.com/a/11998624/7410886
         return element == self.driver.switch_to.active_element
 
+    def list_state(self) -> listdom.ListState:
+        """State of all notes, notebooks and tags in the UI by one request."""
+        logging.debug("UI: read list state")
+        return listdom.read(execute_script)
+
     def get_notebooks(self):
         logging.debug("UI: get notebooks")
         # First match is the "All notes" button.
@@ -185,17 +248,12 @@ class Test(unittest.TestCase):
             By.XPATH, "//div[contains(@class, '-list-item')]"
         )
 
-    def scroll_vertical(self, element, height: int):
-        self.driver.execute_script(
-            "arguments[0].scrollBy(0, arguments[1])", element, height
-        )
-
     def delete_note(self, element, way: str = "hotkey"):
         logging.debug(f"UI: delete note {way=}")
 
         if way == "hotkey":
             element.click()
-            pyautogui.press("delete")
+            inputs.press("delete")
         elif way == "right_click":
             ActionChains(self.driver).context_click(element).perform()
             menu.choose_entry(8)
@@ -206,44 +264,30 @@ class Test(unittest.TestCase):
         menu.choose_entry(1, key="left")
 
     def select_random_notebook(self, exclude: Optional[List[str]] = None):
-        notebooks = self.api.get_all_notebooks()
-        if exclude is not None:
-            # TODO: Could be problematic for multiple time nested notebook.
-            notebooks = [
-                notebook
-                for notebook in notebooks
-                if notebook.id not in exclude and notebook.parent_id not in exclude
-            ]
-        notebook_id = random.choice(notebooks).id
-        notebook_element = self.sidebar.find_element(
-            By.XPATH, f"//div[@data-folder-id='{notebook_id}']"
+        notebook_id = self.mirror.random_notebook(exclude=exclude)
+        notebook_element = self.locators.find(
+            By.XPATH, f"//div[@data-folder-id='{notebook_id}']", scope=self.sidebar
         )
         notebook_element.click()
         return notebook_element, notebook_id
 
     def select_random_note(self, exclude: Optional[List[str]] = None):
-        notes = self.api.get_all_notes()
-        if exclude is not None:
-            notes = [note for note in notes if note.id not in exclude]
-        note = random.choice(notes)
+        note_id, notebook_id = self.mirror.random_note(exclude=exclude)
 
         # click containing folder to show note
-        notebook_element = self.find_element_present(
-            By.XPATH, f"//div[@data-folder-id='{note.parent_id}']"
+        notebook_element = self.locators.find(
+            By.XPATH, f"//div[@data-folder-id='{notebook_id}']"
         )
         notebook_element.click()
 
-        note_element = self.find_element_present(By.XPATH, f"//a[@data-id='{note.id}']")
+        note_element = self.locators.find(By.XPATH, f"//a[@data-id='{note_id}']")
         note_element.click()
-        return note_element, note.id, notebook_element, note.parent_id
+        return note_element, note_id, notebook_element, notebook_id
 
     def get_random_tag(self):
         # Don't click the tag, since loading the note takes time.
-        tags = self.api.get_all_tags()
-        tag_id = random.choice(tags).id
-        tag_element = self.driver.find_element(
-            By.XPATH, f"//div[@data-tag-id='{tag_id}']"
-        )
+        tag_id = self.mirror.random_tag()
+        tag_element = self.locators.find(By.XPATH, f"//div[@data-tag-id='{tag_id}']")
         return tag_element, tag_id
 
     def fill_modal_dialog(
@@ -253,38 +297,34 @@ class Test(unittest.TestCase):
         notebook: bool = False,
         tag: bool = False,
         wait_before_confirm: Optional[float] = None,
+        typing: bool = False,
     ):
-        """Fill out and confirm a modal dialog with one input."""
-        # There are two modal dialogs. Chose the one that is displayed.
-        dialog = self.find_element_visible(
-            By.XPATH,
-            "//div[@class='dialog-root']"
-            if notebook
-            else "//div[@class='modal-layer'][contains(@style, 'display: flex')]",
+        """
+        Fill out and confirm a modal dialog with one input. The value is set
+        directly, unless typing is requested.
+        """
+        text_entry.fill_modal_dialog(
+            self.driver,
+            input_,
+            confirm_by_button=confirm_by_button,
+            notebook=notebook,
+            tag=tag,
+            wait_before_confirm=wait_before_confirm,
+            typing=typing,
         )
-        input_element = dialog.find_element(By.TAG_NAME, "input")
-        # Sometimes clear() and other workarounds don't work.
-        # Use backspace instead. It takes longer, but works reliably.
-        # See: https://stackoverflow.com/a/50682169/7410886
-        while input_element.get_attribute("value") != "":
-            input_element.send_keys(Keys.BACKSPACE)
-        input_element.send_keys(input_)
-        if wait_before_confirm is not None:
-            time.sleep(wait_before_confirm)
-        if tag:
-            input_element.send_keys(Keys.ENTER)
-        if confirm_by_button:
-            # Assume the first button is to confirm.
-            confirm_button = dialog.find_element(By.TAG_NAME, "button")
-            confirm_button.click()
-        else:
-            input_element.send_keys(Keys.ENTER)
 
     def get_notebook_count_api(self):
-        return len(self.api.get_all_notebooks())
+        return self.mirror.notebook_count()
 
     def get_note_count_api(self):
-        return len(self.api.get_all_notes())
+        return self.mirror.note_count()
 
     def get_tag_count_api(self):
-        return len(self.api.get_all_tags())
+        return self.mirror.tag_count()
+
+    def note_exists_api(self, id_: str) -> bool:
+        return self.mirror.has_note(id_)
+
+
+if profiling.enabled():
+    Test.wait_for = staticmethod(profiling.timed("wait", Test.wait_for))
@@ -0,0 +1,5 @@
+"""
+Benchmarks of the test harness. Most of them don't need joplin or a display.
+"bench_startup" and "bench_inputs" need xvfb and are skipped without it.
+Run them from the repository root, for example: "python -m benchmarks.bench_scheduler"
+"""
@@ -0,0 +1,52 @@
+"""Compare the blocking time of synchronous and background artifact writing."""
+
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image
+
+import capture
+
+
+def make_frame(width: int, height: int) -> Image.Image:
+    """Random noise is the worst case for the PNG compression."""
+    return Image.frombytes("RGB", (width, height), os.urandom(width * height * 3))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--failures", type=int, default=10)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    args = parser.parse_args()
+    frame = make_frame(args.width, args.height)
+
+    print("mode       | blocking per failure [ms] | total [s]")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        t_start = time.perf_counter()
+        for index in range(args.failures):
+            capture.write_image(f"{tmpdir}/sync_{index}.png", frame)
+        blocking = time.perf_counter() - t_start
+        print(
+            f"{'sync':10} | {blocking / args.failures * 1000:25.1f} | {blocking:9.3f}"
+        )
+
+        t_start = time.perf_counter()
+        for index in range(args.failures):
+            # Like in the tests: The grab is copied, the encoding is deferred.
+            capture.pool.submit(
+                capture.write_image, f"{tmpdir}/async_{index}.png", frame.copy()
+            )
+        blocking = time.perf_counter() - t_start
+        capture.pool.flush()
+        total = time.perf_counter() - t_start
+        print(
+            f"{'background':10} | {blocking / args.failures * 1000:25.1f} | "
+            f"{total:9.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
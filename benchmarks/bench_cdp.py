@@ -0,0 +1,129 @@
+"""
+Compare the latency of frequent operations by the webdriver and by a direct
+devtools connection, against local stand-ins.
+"""
+
+import argparse
+import base64
+import os
+import statistics
+import time
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+from benchmarks.standins import FakeDevTools, FakeWebDriver
+import cdp
+import listdom
+
+
+def fake_list_state(notes: int) -> dict:
+    return {
+        "notes": [
+            {
+                "id": f"{index:032x}",
+                "title": f"note {index}",
+                "selected": index == 0,
+                "visible": True,
+                "is_todo": False,
+                "todo_completed": False,
+            }
+            for index in range(notes)
+        ],
+        "notebooks": [],
+        "tags": [],
+    }
+
+
+def measure(func, repetitions: int) -> float:
+    """Median duration in milliseconds."""
+    durations = []
+    for _ in range(repetitions):
+        t_start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - t_start)
+    return statistics.median(durations) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--screenshot-kb", type=int, default=200)
+    parser.add_argument("--repetitions", type=int, default=50)
+    parser.add_argument(
+        "--hop-latency",
+        type=float,
+        default=0.0,
+        help="Additional latency of the chromedriver process hop in seconds.",
+    )
+    args = parser.parse_args()
+
+    list_state = fake_list_state(args.notes)
+    data = base64.b64encode(os.urandom(args.screenshot_kb * 1024)).decode()
+    screenshot = {"data": data}
+    methods = {
+        "Page.captureScreenshot": lambda params: screenshot,
+        "Runtime.evaluate": lambda params: {"result": {"value": list_state}},
+        "Input.dispatchKeyEvent": lambda params: {},
+    }
+
+    driver_server = FakeWebDriver(latency=args.hop_latency)
+    with driver_server, FakeDevTools() as devtools_server:
+        driver_server.methods.update(methods)
+        driver_server.add_input()
+        devtools_server.methods.update(methods)
+
+        driver = webdriver.Remote(
+            command_executor=driver_server.url, options=webdriver.ChromeOptions()
+        )
+        driver.command_executor._commands[  # pylint: disable=protected-access
+            "executeCdpCommand"
+        ] = ("POST", "/session/$sessionId/goog/cdp/execute")
+        element = driver.find_element(By.TAG_NAME, "input")
+
+        def driver_execute_script(script, *script_args):
+            # Like the fallback of driver.execute_script().
+            return driver.execute_script(
+                f"return {cdp.build_call(script, script_args)};"
+            )
+
+        # The stand-in can't execute scripts. Return the list state for the script.
+        list_state_call = cdp.build_call(
+            listdom.LIST_STATE_SCRIPT,
+            [cdp.Selector(".rli-sideBar"), cdp.Selector(".rli-noteList")],
+        )
+        driver_server.scripts[f"return {list_state_call};"] = lambda: list_state
+
+        session = cdp.CdpSession(cdp.find_page(devtools_server.debugger_address))
+        operations = {
+            "list state": (
+                lambda: listdom.read(driver_execute_script),
+                lambda: listdom.read(session.execute_script),
+            ),
+            "screenshot": (
+                lambda: driver.execute(
+                    "executeCdpCommand",
+                    {"cmd": "Page.captureScreenshot", "params": {}},
+                ),
+                lambda: session.send("Page.captureScreenshot"),
+            ),
+            "key press": (
+                lambda: element.send_keys("a"),
+                lambda: session.press("a"),
+            ),
+        }
+
+        print("operation  | webdriver [ms] | devtools [ms] | speedup")
+        for name, (by_driver, by_devtools) in operations.items():
+            driver_ms = measure(by_driver, args.repetitions)
+            devtools_ms = measure(by_devtools, args.repetitions)
+            print(
+                f"{name:10} | {driver_ms:14.2f} | {devtools_ms:13.2f} | "
+                f"{driver_ms / devtools_ms:7.1f}"
+            )
+        session.close()
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
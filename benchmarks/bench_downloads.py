@@ -0,0 +1,95 @@
+"""Check the download cache against a local file server: memory, resuming, sharing."""
+
+import argparse
+import concurrent.futures
+import hashlib
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import requests
+
+from benchmarks.standins import FileServer
+import downloads
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=64, help="File size in MiB.")
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    random.seed(0)
+    content = random.randbytes(args.size * 1024 * 1024)
+    sha256 = hashlib.sha256(content).hexdigest()
+    files = {"/joplin.AppImage": content}
+
+    with FileServer(files) as server, tempfile.TemporaryDirectory() as cache_dir:
+        url = f"{server.url}/joplin.AppImage"
+
+        # streaming: The memory usage should be independent of the file size.
+        tracemalloc.start()
+        t_start = time.perf_counter()
+        path = downloads.fetch(url, sha256=sha256, cache_dir=cache_dir)
+        duration = time.perf_counter() - t_start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"download: {args.size / duration:.0f} MiB/s, "
+            f"peak python memory {peak / 1024 / 1024:.1f} MiB for {args.size} MiB"
+        )
+        assert os.path.getsize(path) == len(content)
+
+        # cache hit
+        t_start = time.perf_counter()
+        assert downloads.fetch(url, cache_dir=cache_dir) == path
+        print(f"cache hit: {(time.perf_counter() - t_start) * 1000:.2f} ms")
+
+        # pinning: A pinned checksum replaces a stale, recorded one.
+        stale = [f"{cache_dir}/urls/{name}" for name in os.listdir(f"{cache_dir}/urls")]
+        downloads.write_atomic(stale[0], "0" * 64)
+        assert downloads.fetch(url, sha256=sha256, cache_dir=cache_dir) == path
+        print(f"pinning: {len(server.downloads)} download(s)")
+
+        # corruption: A truncated object is downloaded again.
+        os.truncate(path, len(content) // 2)
+        assert downloads.fetch(url, cache_dir=cache_dir) == path
+        assert os.path.getsize(path) == len(content)
+        print(f"corruption: {len(server.downloads)} download(s)")
+
+    with FileServer(files) as server, tempfile.TemporaryDirectory() as cache_dir:
+        url = f"{server.url}/joplin.AppImage"
+
+        # resuming: Only the missing part is transferred at the second try.
+        server.abort_after = len(content) // 2
+        try:
+            downloads.fetch(url, sha256=sha256, cache_dir=cache_dir)
+        except requests.exceptions.RequestException:
+            pass
+        partial = os.listdir(f"{cache_dir}/partial")
+        resumed_at = os.path.getsize(f"{cache_dir}/partial/{partial[0]}")
+        downloads.fetch(url, sha256=sha256, cache_dir=cache_dir)
+        print(f"resume: continued at {resumed_at / len(content):.0%} of the file")
+
+    with FileServer(files) as server, tempfile.TemporaryDirectory() as cache_dir:
+        url = f"{server.url}/joplin.AppImage"
+
+        # sharing: Parallel workers download only once.
+        with concurrent.futures.ProcessPoolExecutor(args.processes) as executor:
+            paths = set(
+                executor.map(
+                    downloads.fetch,
+                    [url] * args.processes,
+                    [sha256] * args.processes,
+                    [cache_dir] * args.processes,
+                )
+            )
+        assert len(paths) == 1
+        downloads_ = len(server.downloads)
+        print(f"sharing: {downloads_} download(s) for {args.processes} processes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Compare the cost per keystroke of the OS level input backends inside xvfb."""
+
+import argparse
+import shutil
+import time
+
+from xvfbwrapper import Xvfb
+
+import inputs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, default=200)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 10])
+    args = parser.parse_args()
+    if shutil.which("Xvfb") is None:
+        print("Skipped: xvfb isn't installed.")
+        return
+
+    print("backend   | keys per call | per key [ms] | total [s]")
+    # Nobody listens inside the fresh display, so the keys don't have any effect.
+    with Xvfb(width=1280, height=720):
+        for name, backend_class in inputs.BACKENDS.items():
+            backend = backend_class()
+            for batch in args.batches:
+                t_start = time.perf_counter()
+                for _ in range(args.keys // batch):
+                    backend.press(["shift"] * batch, delay=0)
+                total = time.perf_counter() - t_start
+                print(
+                    f"{name:9} | {batch:13} | "
+                    f"{total / (args.keys // batch * batch) * 1000:12.3f} | "
+                    f"{total:9.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Run the load generator against the data API stand-in."""
+
+import argparse
+
+from benchmarks.standins import FakeDataApi
+import loadtest
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--rate", type=float, help="Target operations per second.")
+    parser.add_argument(
+        "--latency", type=float, default=0.002, help="Stand-in latency in seconds."
+    )
+    args = parser.parse_args()
+
+    for concurrency in args.concurrency:
+        print(f"Concurrency {concurrency}:")
+        with FakeDataApi(latency=args.latency) as server:
+            client = loadtest.LoadClient(server.url, "token", concurrency)
+            client.setup(notes=200, tags=10)
+            seeded = server.requests
+            generator = loadtest.LoadGenerator(
+                client, loadtest.DEFAULT_MIX, concurrency, rate=args.rate
+            )
+            duration = generator.run(args.duration)
+            summary = generator.stats.summary(duration)
+            loadtest.print_summary(summary, duration)
+            # Each request of the generator has to arrive at the server.
+            sent = sum(row["requests"] for row in summary.values())
+            assert sent == server.requests - seeded, (sent, server.requests - seeded)
+            assert not any(row["errors"] for row in summary.values())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare the naive and the cost-balanced test distribution with synthetic timings."""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from history import DurationHistory
+import scheduler
+
+
+def synthetic_history(path: str, classes: int, tests_per_class: int, runs: int):
+    """Fill a history database with log-normal distributed test durations."""
+    history = DurationHistory(path)
+    for class_index in range(classes):
+        # Some classes are much slower than others, like "Go" and "Notebook".
+        class_scale = random.lognormvariate(0, 1)
+        for test_index in range(tests_per_class):
+            test_scale = class_scale * random.lognormvariate(0, 0.5)
+            for _ in range(runs):
+                history.record(
+                    f"test_synthetic.Class{class_index}.test_{test_index}",
+                    test_scale * random.uniform(0.9, 1.1),
+                )
+    return history
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--classes", type=int, default=8)
+    parser.add_argument("--tests-per-class", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 3, 4, 8])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        history = synthetic_history(
+            os.path.join(tmpdir, "history.sqlite"),
+            args.classes,
+            args.tests_per_class,
+            args.runs,
+        )
+        test_classes = [f"test_synthetic.Class{i}" for i in range(args.classes)]
+        t_start = time.perf_counter()
+        costs = history.class_costs(test_classes)
+        t_predict = time.perf_counter() - t_start
+        history.close()
+
+    print(
+        f"prediction: {t_predict * 1000:.1f} ms, total cost {sum(costs.values()):.1f}"
+    )
+    print("workers | lower bound | naive | balanced")
+    for workers in args.workers:
+        lower_bound = max(sum(costs.values()) / workers, max(costs.values()))
+        naive = scheduler.makespan(scheduler.plan_naive(test_classes, workers), costs)
+        balanced = scheduler.makespan(scheduler.plan_balanced(costs, workers), costs)
+        print(f"{workers:7} | {lower_bound:11.1f} | {naive:5.1f} | {balanced:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Compare sequential joppy calls with the concurrent seeding against a stand-in."""
+
+import argparse
+import time
+
+from joppy.api import Api
+
+from benchmarks.standins import FakeDataApi
+import seeding
+
+
+def make_spec(
+    notebooks: int, notes_per_notebook: int, tags: int
+) -> seeding.FixtureSpec:
+    return seeding.FixtureSpec(
+        notebooks=[
+            seeding.NotebookSpec(
+                f"notebook {i}",
+                notes=[
+                    seeding.NoteSpec(
+                        f"note {i}.{j}",
+                        body="content",
+                        is_todo=j % 2 == 1,
+                        tags=[f"tag {(i + j) % tags}"] if tags else (),
+                    )
+                    for j in range(notes_per_notebook)
+                ],
+                children=[seeding.NotebookSpec(f"sub-notebook {i}")],
+            )
+            for i in range(notebooks)
+        ]
+    )
+
+
+def seed_sequential(api: Api, spec: seeding.FixtureSpec) -> int:
+    """The way of the test classes before: One blocking joppy call at a time."""
+    requests = 0
+    tag_ids = {}
+    for notebook in spec.notebooks:
+        notebook_id = api.add_notebook(title=notebook.title)
+        for child in notebook.children:
+            api.add_notebook(title=child.title, parent_id=notebook_id)
+            requests += 1
+        for note in notebook.notes:
+            note_id = api.add_note(
+                title=note.title,
+                body=note.body,
+                is_todo=int(note.is_todo),
+                parent_id=notebook_id,
+            )
+            for tag in note.tags:
+                if tag not in tag_ids:
+                    tag_ids[tag] = api.add_tag(title=tag)
+                    requests += 1
+                api.add_tag(tag_id=tag_ids[tag], id_=note_id)
+                requests += 1
+            requests += 1
+        requests += 1
+    return requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notebooks", type=int, default=20)
+    parser.add_argument("--notes-per-notebook", type=int, default=50)
+    parser.add_argument("--tags", type=int, default=10)
+    parser.add_argument(
+        "--latency", type=float, default=0.002, help="Stand-in latency in seconds."
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+    spec = make_spec(args.notebooks, args.notes_per_notebook, args.tags)
+
+    print("client | requests | duration [s] | throughput [1/s]")
+    with FakeDataApi(latency=args.latency) as server:
+        t_start = time.perf_counter()
+        requests = seed_sequential(Api("token", url=server.url), spec)
+        duration = time.perf_counter() - t_start
+        throughput = requests / duration
+        print(f"{'joppy':>6} | {requests:8} | {duration:12.3f} | {throughput:16.0f}")
+
+    for concurrency in args.concurrency:
+        with FakeDataApi(latency=args.latency) as server:
+            result = seeding.Seeder(server.url, "token", concurrency=concurrency).seed(
+                spec
+            )
+            assert len(server.items["notes"]) == len(result.notes)
+            print(
+                f"{concurrency:6} | {result.requests:8} | {result.duration:12.3f} | "
+                f"{result.requests / result.duration:16.0f}"
+            )
+
+    # Responses of applied requests get lost. Nothing is created twice.
+    with FakeDataApi(latency=args.latency) as server:
+        server.failing_posts = 20
+        result = seeding.Seeder(server.url, "token").seed(spec)
+        assert len(server.items["notes"]) == len(result.notes)
+        print(f"lost responses: {20 - server.failing_posts} recovered")
+
+
+if __name__ == "__main__":
+    main()
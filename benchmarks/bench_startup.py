@@ -0,0 +1,74 @@
+"""
+Compare the cold start of the AppImage with the cold start of the extracted app.
+Needs xvfb, but no running joplin.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from xvfbwrapper import Xvfb
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh process, since importing "driver" starts the app.
+START_SCRIPT = """
+import time
+t_start = time.perf_counter()
+import driver
+driver.wait_until_loaded(timeout=60)
+print(time.perf_counter() - t_start)
+driver.driver.quit()
+driver.chromedriver_service.stop()
+"""
+
+
+def start_app(extract: bool) -> float:
+    """Start the app with a fresh profile and return the time until it's loaded."""
+    env = {**os.environ, "PYTHONPATH": ROOT_DIR}
+    if extract:
+        env["JOPLIN_EXTRACT_APPIMAGE"] = "1"
+    with tempfile.TemporaryDirectory() as cwd:
+        output = subprocess.run(
+            [sys.executable, "-c", START_SCRIPT],
+            cwd=cwd,
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    if shutil.which("Xvfb") is None:
+        print("Skipped: xvfb isn't installed.")
+        return
+
+    with Xvfb(width=1920, height=1080):
+        # Download and extract once, so that only the start is measured.
+        t_start = time.perf_counter()
+        start_app(extract=True)
+        print(
+            f"first start, including extraction: {time.perf_counter() - t_start:.2f} s"
+        )
+
+        for extract in (False, True):
+            durations = [start_app(extract) for _ in range(args.runs)]
+            print(
+                f"{'extracted' if extract else 'AppImage':>9}: "
+                f"median {statistics.median(durations):.2f} s, "
+                f"min {min(durations):.2f} s, max {max(durations):.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare the ways to replace the value of an input against a fake webdriver."""
+
+import argparse
+import time
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+from benchmarks.standins import FakeWebDriver
+import text_entry
+
+
+def type_text_legacy(element, text: str):
+    """Former way: Clear by backspace, one request per character, and type."""
+    # Sometimes clear() and other workarounds don't work.
+    # See: https://stackoverflow.com/a/50682169/7410886
+    while element.get_attribute("value") != "":
+        element.send_keys(Keys.BACKSPACE)
+    element.send_keys(text)
+
+
+def set_value(element, text: str) -> str:
+    """Python implementation of text_entry.SET_VALUE_SCRIPT."""
+    element.value = text
+    return element.value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument(
+        "--latency", type=float, default=0.001, help="Stand-in latency in seconds."
+    )
+    args = parser.parse_args()
+
+    ways = {
+        "backspace": lambda driver, element, text: type_text_legacy(element, text),
+        "select": lambda driver, element, text: text_entry.type_text(element, text),
+        "set": text_entry.enter_text,
+    }
+
+    print("way       | old length | requests | duration [ms]")
+    with FakeWebDriver(latency=args.latency) as server:
+        server.scripts[text_entry.SET_VALUE_SCRIPT] = set_value
+        server.add_input()
+        driver = webdriver.Remote(
+            command_executor=server.url, options=webdriver.ChromeOptions()
+        )
+        element = driver.find_element(By.TAG_NAME, "input")
+        fake_input = next(iter(server.elements.values()))
+        for length in args.lengths:
+            for way, enter_text in ways.items():
+                fake_input.value = "x" * length
+                requests = server.requests
+                t_start = time.perf_counter()
+                enter_text(driver, element, "new title")
+                duration = time.perf_counter() - t_start
+                assert fake_input.value == "new title", fake_input.value
+                print(
+                    f"{way:9} | {length:10} | {server.requests - requests:8} | "
+                    f"{duration * 1000:13.1f}"
+                )
+        driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+"""Local stand-ins for the external services. They only keep their state in memory."""
+
+import abc
+import base64
+import collections
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import struct
+import threading
+import time
+import urllib.parse
+import uuid
+
+
+class StandIn(ThreadingHTTPServer):
+    """HTTP server on a free local port, running in a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, handler, latency: float = 0.0):
+        super().__init__(("127.0.0.1", 0), handler)
+        # Artificial processing time of each request in seconds.
+        self.latency = latency
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+        return False
+
+
+class JsonHandler(BaseHTTPRequestHandler, metaclass=abc.ABCMeta):
+    """Request handler with keep-alive and JSON responses."""
+
+    protocol_version = "HTTP/1.1"
+    # Else the delayed acknowledgement adds 40 ms to each keep-alive request.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass  # Don't spam the benchmark output.
+
+    def send_json(self, data, status: int = 200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or "null")
+
+    @abc.abstractmethod
+    def handle_request(self, method: str):
+        """Answer the request. The stand-in is available as "self.server"."""
+
+    def dispatch(self, method: str):
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.handle_request(method)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.dispatch("GET")
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self.dispatch("POST")
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        self.dispatch("PUT")
+
+    def do_DELETE(self):  # pylint: disable=invalid-name
+        self.dispatch("DELETE")
+
+
+class DuplicateIdError(Exception):
+    pass
+
+
+class DataApiHandler(JsonHandler):
+    """Subset of the joplin data API: https://joplinapp.org/api/references/rest_api/"""
+
+    def handle_request(self, method: str):
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        body = self.read_json() if method in ("POST", "PUT") else None
+        if query.get("token") != self.server.token:
+            self.send_json({"error": "Invalid token"}, status=403)
+            return
+        parts = url.path.strip("/").split("/")
+        with self.server.lock:
+            try:
+                response = self.server.route(method, parts, query, body)
+            except DuplicateIdError as error:
+                # Like joplin, when an item with the same ID exists already.
+                self.send_json({"error": str(error)}, status=500)
+                return
+            failed = method == "POST" and self.server.failing_posts > 0
+            if failed:
+                self.server.failing_posts -= 1
+        if failed:
+            # The POST is applied, but the response says otherwise.
+            self.send_json({"error": "Service unavailable"}, status=503)
+        elif response is None:
+            self.send_json({"error": "Not found"}, status=404)
+        elif isinstance(response, str):
+            # The ping response is plain text.
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response.encode())
+        else:
+            self.send_json(response)
+
+
+class FakeDataApi(StandIn):
+    """In-memory notes, notebooks and tags, served like the joplin clipper server."""
+
+    def __init__(self, token: str = "token", latency: float = 0.0):
+        super().__init__(DataApiHandler, latency=latency)
+        self.token = token
+        self.items = {"notes": {}, "folders": {}, "tags": {}}
+        self.note_tags = set()  # tuples of (tag ID, note ID)
+        self.events = []  # note changes, the cursor is the index after an event
+        # Amount of the next POST requests, that are applied and answered by 503.
+        self.failing_posts = 0
+
+    @staticmethod
+    def paginate(items, query):
+        fields = query.get("fields", "id,parent_id,title").split(",")
+        limit = int(query.get("limit", 100))
+        page = int(query.get("page", 1))
+        selected = items[(page - 1) * limit : page * limit]
+        return {
+            "items": [{key: item.get(key) for key in fields} for item in selected],
+            "has_more": page * limit < len(items),
+        }
+
+    def add_event(self, parts, type_: int):
+        if parts[0] == "notes":
+            self.events.append(
+                {
+                    "id": len(self.events) + 1,
+                    "item_type": 1,
+                    "item_id": parts[1],
+                    "type": type_,
+                    "created_time": int(time.time() * 1000),
+                }
+            )
+
+    def get_events(self, query):
+        if "cursor" not in query:
+            return {"items": [], "has_more": False, "cursor": len(self.events)}
+        cursor = int(query["cursor"])
+        # Like joplin, return up to 100 events per request.
+        items = self.events[cursor : cursor + 100]
+        return {
+            "items": items,
+            "has_more": cursor + len(items) < len(self.events),
+            "cursor": cursor + len(items),
+        }
+
+    def route(self, method, parts, query, body):
+        # pylint: disable=too-many-return-statements,too-many-branches
+        if parts == ["ping"]:
+            return "JoplinClipperServer"
+        if parts == ["events"] and method == "GET":
+            return self.get_events(query)
+        if parts == ["search"] and method == "GET":
+            # Joplin uses a full text search. A substring of the title is enough here.
+            notes = [
+                note
+                for note in self.items["notes"].values()
+                if query.get("query", "") in note["title"]
+            ]
+            return self.paginate(notes, query)
+        if not parts or parts[0] not in self.items:
+            return None
+        items = self.items[parts[0]]
+
+        if len(parts) == 1:
+            if method == "GET":
+                return self.paginate(list(items.values()), query)
+            if method == "POST":
+                item = {"parent_id": "", "title": "", "body": "", **body}
+                item.setdefault("id", uuid.uuid4().hex)
+                if item["id"] in items:
+                    raise DuplicateIdError(f"Duplicate ID {item['id']}")
+                item["created_time"] = item["updated_time"] = int(time.time() * 1000)
+                items[item["id"]] = item
+                self.add_event([parts[0], item["id"]], 1)
+                return item
+            return None
+
+        item = items.get(parts[1])
+        if item is None:
+            return None
+        if len(parts) == 2:
+            if method == "GET":
+                return self.paginate([item], query)["items"][0]
+            if method == "PUT":
+                item.update(body)
+                item["updated_time"] = int(time.time() * 1000)
+                self.add_event(parts, 2)
+                return item
+            if method == "DELETE":
+                del items[parts[1]]
+                self.add_event(parts, 3)
+                return {}
+            return None
+
+        if parts[0] == "tags" and parts[2] == "notes":
+            if method == "POST":
+                self.note_tags.add((parts[1], body["id"]))
+                return {"id": body["id"], "tag_id": parts[1]}
+            note_ids = [
+                note_id for tag_id, note_id in self.note_tags if tag_id == parts[1]
+            ]
+            return self.paginate([self.items["notes"][id_] for id_ in note_ids], query)
+        if parts[0] == "notes" and parts[2] == "tags":
+            tags = [
+                self.items["tags"][tag_id]
+                for tag_id, note_id in self.note_tags
+                if note_id == parts[1]
+            ]
+            return self.paginate(tags, query)
+        if parts[0] == "folders" and parts[2] == "notes":
+            notes = [
+                note
+                for note in self.items["notes"].values()
+                if note["parent_id"] == parts[1]
+            ]
+            return self.paginate(notes, query)
+        return None
+
+
+class FileHandler(JsonHandler):
+    """Serves static files with support for range requests."""
+
+    def handle_request(self, method: str):
+        content = self.server.files.get(self.path)
+        if method != "GET" or content is None:
+            self.send_json({"error": "Not found"}, status=404)
+            return
+        self.server.downloads.append(self.path)
+
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header is not None and self.server.support_ranges:
+            start = int(range_header.split("=")[1].split("-")[0])
+            if start >= len(content):
+                self.send_json({"error": "Range not satisfiable"}, status=416)
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(content) - 1}/{len(content)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(content) - start))
+        self.end_headers()
+
+        end = len(content)
+        if self.server.abort_after is not None:
+            # Simulate a broken connection once.
+            end = min(end, start + self.server.abort_after)
+            self.server.abort_after = None
+        view = memoryview(content)
+        for offset in range(start, end, 64 * 1024):
+            self.wfile.write(view[offset : min(offset + 64 * 1024, end)])
+        if end < len(content):
+            self.close_connection = True
+
+
+class FileServer(StandIn):
+    """Stand-in for a download server, like the github releases."""
+
+    def __init__(self, files: dict, support_ranges: bool = True):
+        super().__init__(FileHandler)
+        self.files = files  # map of path to content
+        self.support_ranges = support_ranges
+        self.downloads = []  # requested paths
+        # Abort the next transfer after the given amount of bytes.
+        self.abort_after = None
+
+
+# Key codes of the webdriver protocol.
+BACKSPACE = "\ue003"
+CONTROL = "\ue009"
+NULL = "\ue000"
+ENTER = "\ue007"
+ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+
+class FakeInput:
+    """Input element that understands the keys used by the tests."""
+
+    def __init__(self, value: str = ""):
+        self.value = value
+        self.submitted = 0
+
+    def send_keys(self, text: str):
+        control = selected = False
+        for key in text:
+            if key == CONTROL:
+                control = True
+            elif key == NULL:
+                control = False
+            elif control and key == "a":
+                selected = True
+            elif key == BACKSPACE:
+                self.value = "" if selected else self.value[:-1]
+                selected = False
+            elif key == ENTER:
+                self.submitted += 1
+            else:
+                self.value = key if selected else self.value + key
+                selected = False
+
+
+class WebDriverHandler(JsonHandler):
+    """Subset of the webdriver protocol: https://www.w3.org/TR/webdriver/"""
+
+    def handle_request(self, method: str):
+        body = self.read_json() if method == "POST" else None
+        parts = self.path.strip("/").split("/")
+        with self.server.lock:
+            value = self.server.route(method, parts, body)
+        self.send_json({"value": value})
+
+
+class FakeWebDriver(StandIn):
+    """
+    Stand-in for chromedriver with a page of input elements. Scripts can't be
+    executed. Python functions can be registered for known scripts instead.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(WebDriverHandler, latency=latency)
+        self.elements = {}  # map of element ID to FakeInput
+        # Map of script to function, which gets the arguments of the script.
+        self.scripts = {}
+        self.commands = collections.Counter()  # requests by command
+        # Map of devtools method to function, which gets the parameters.
+        self.methods = {}
+
+    def add_input(self, value: str = "") -> str:
+        element_id = uuid.uuid4().hex
+        self.elements[element_id] = FakeInput(value)
+        return element_id
+
+    def unwrap(self, value):
+        if isinstance(value, dict) and ELEMENT_KEY in value:
+            return self.elements[value[ELEMENT_KEY]]
+        return value
+
+    def execute_script(self, script: str, args: list):
+        args = [self.unwrap(arg) for arg in args]
+        if script.startswith("/* getAttribute */"):
+            element, name = args
+            return getattr(element, name, None)
+        if script.startswith("/* isDisplayed */"):
+            return True
+        return self.scripts[script](*args)
+
+    def route(self, method, parts, body):
+        # pylint: disable=too-many-return-statements
+        if parts == ["session"]:
+            self.commands["newSession"] += 1
+            return {"sessionId": "fake", "capabilities": {"browserName": "fake"}}
+        command = "/".join(part for part in parts[2:] if part not in self.elements)
+        self.commands[f"{method} {command}"] += 1
+        if len(parts) == 2 and method == "DELETE":
+            return None
+        if command in ("execute/sync", "execute/async"):
+            # Asynchronous scripts get their result like synchronous ones.
+            return self.execute_script(body["script"], body["args"])
+        if command in ("element", "element/element"):
+            # Each lookup finds the first input.
+            return {ELEMENT_KEY: next(iter(self.elements))}
+        if command == "goog/cdp/execute":
+            return self.methods[body["cmd"]](body["params"])
+        if command == "element/value":
+            self.elements[parts[3]].send_keys(body["text"])
+            return None
+        return None
+
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class DevToolsHandler(JsonHandler):
+    """
+    Target list and websocket endpoint of the devtools protocol. Only text frames
+    up to the size of the messages of the benchmarks are supported.
+    """
+
+    def handle_request(self, method: str):
+        if self.path == "/json":
+            self.send_json(
+                [
+                    {
+                        "type": "page",
+                        "url": "file:///index.html",
+                        "webSocketDebuggerUrl": f"{self.server.ws_url}/page",
+                    }
+                ]
+            )
+            return
+        if self.headers.get("Upgrade", "").lower() != "websocket":
+            self.send_json({"error": "Not found"}, status=404)
+            return
+
+        accept = hashlib.sha1(
+            (self.headers["Sec-WebSocket-Key"] + WEBSOCKET_GUID).encode()
+        ).digest()
+        self.send_response(101)
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", base64.b64encode(accept).decode())
+        self.end_headers()
+        self.wfile.flush()
+
+        while True:
+            opcode, payload = self.read_frame()
+            if opcode == 8:  # close
+                self.write_frame(8, b"")
+                self.close_connection = True
+                return
+            if self.server.latency:
+                time.sleep(self.server.latency)
+            with self.server.lock:
+                self.server.requests += 1
+            message = json.loads(payload)
+            result = self.server.methods[message["method"]](message.get("params", {}))
+            self.write_frame(
+                1, json.dumps({"id": message["id"], "result": result}).encode()
+            )
+
+    def read_frame(self):
+        first, second = self.rfile.read(2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self.rfile.read(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self.rfile.read(8))[0]
+        # Frames of the client are always masked.
+        mask = self.rfile.read(4)
+        payload = bytes(
+            byte ^ mask[index % 4] for index, byte in enumerate(self.rfile.read(length))
+        )
+        return first & 0x0F, payload
+
+    def write_frame(self, opcode: int, payload: bytes):
+        header = bytes([0x80 | opcode])
+        if len(payload) < 126:
+            header += bytes([len(payload)])
+        elif len(payload) < 2**16:
+            header += bytes([126]) + struct.pack("!H", len(payload))
+        else:
+            header += bytes([127]) + struct.pack("!Q", len(payload))
+        self.wfile.write(header + payload)
+        self.wfile.flush()
+
+
+class FakeDevTools(StandIn):
+    """
+    Stand-in for the devtools endpoint of the renderer. Python functions
+    are registered for the methods. They get the parameters of the command.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(DevToolsHandler, latency=latency)
+        self.methods = {}
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.server_address[1]}/devtools"
+
+    @property
+    def debugger_address(self) -> str:
+        return f"127.0.0.1:{self.server_address[1]}"
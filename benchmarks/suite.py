@@ -0,0 +1,312 @@
+"""
+Time the primitives of the test harness against local stand-ins. No joplin and no
+display are needed, so regressions of the harness itself become visible.
+
+Compare against a stored baseline:
+python -m benchmarks.suite --output baseline.json
+python -m benchmarks.suite --baseline baseline.json
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from joppy.api import Api
+from selenium import webdriver
+
+from benchmarks.standins import ELEMENT_KEY, FakeDataApi, FakeWebDriver
+import menu
+from mirror import StateMirror
+import stats
+import text_entry
+import wait
+
+# Functions that prepare a case and return the operation to time.
+CASES: Dict[str, Callable] = {}
+
+
+def case(name: str):
+    def register(setup: Callable):
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+class Context:
+    """Stand-ins and clients, shared by all cases."""
+
+    def __init__(self, data_api: FakeDataApi, web_driver: FakeWebDriver, seed: int):
+        self.data_api = data_api
+        self.web_driver = web_driver
+        self.random = random.Random(seed)
+        self.api = Api("token", url=data_api.url)
+        self.driver = webdriver.Remote(
+            command_executor=web_driver.url, options=webdriver.ChromeOptions()
+        )
+
+        self.input_id = web_driver.add_input()
+        # Each wait finds the input immediately.
+        web_driver.scripts[wait.WAIT_SCRIPT] = lambda *_: {ELEMENT_KEY: self.input_id}
+        web_driver.scripts[text_entry.SET_VALUE_SCRIPT] = self.set_value
+
+    @staticmethod
+    def set_value(element, text: str) -> str:
+        """Python implementation of text_entry.SET_VALUE_SCRIPT."""
+        element.value = text
+        return element.value
+
+    def populate(self, notebooks: int, notes_per_notebook: int, tags: int):
+        for i in range(notebooks):
+            notebook_id = self.api.add_notebook(title=f"notebook {i}")
+            for j in range(notes_per_notebook):
+                self.api.add_note(title=f"note {i}.{j}", parent_id=notebook_id)
+        for i in range(tags):
+            self.api.add_tag(title=f"tag {i}")
+
+    def close(self):
+        self.driver.quit()
+
+
+@case("wait_for: immediate")
+def wait_for_immediate(context: Context):
+    return lambda: wait.wait_for(lambda: True)
+
+
+@case("wait_for: third poll")
+def wait_for_third_poll(context: Context):
+    def run():
+        polls = iter((False, False, True))
+        wait.wait_for(lambda: next(polls), interval=0.001)
+
+    return run
+
+
+@case("find_element_present")
+def find_element_present(context: Context):
+    return lambda: wait.wait_for_element(
+        context.driver, "xpath", "//input", condition="present"
+    )
+
+
+@case("find_element_visible")
+def find_element_visible(context: Context):
+    return lambda: wait.wait_for_element(
+        context.driver, "xpath", "//input", condition="visible"
+    )
+
+
+@case("find_element_clickable")
+def find_element_clickable(context: Context):
+    return lambda: wait.wait_for_element(
+        context.driver, "xpath", "//input", condition="clickable"
+    )
+
+
+@case("fill_modal_dialog")
+def fill_modal_dialog(context: Context):
+    return lambda: text_entry.fill_modal_dialog(
+        context.driver, f"notebook {context.random.random()}", notebook=True
+    )
+
+
+@case("fill_modal_dialog: typing")
+def fill_modal_dialog_typing(context: Context):
+    return lambda: text_entry.fill_modal_dialog(
+        context.driver, f"tag {context.random.random()}", tag=True
+    )
+
+
+def menu_paths():
+    for entry in menu.TOP_MENU_LAYOUT:
+        for subentry in entry.subentries:
+            yield (entry.name, subentry.name)
+
+
+@case("menu.top: plan")
+def menu_plan(context: Context):
+    paths = list(menu_paths())
+
+    def run():
+        menu.compile_path.cache_clear()
+        for path in paths:
+            menu.compile_path(path)
+
+    return run
+
+
+@case("menu.top: cached plan")
+def menu_plan_cached(context: Context):
+    paths = list(menu_paths())
+    return lambda: [menu.compile_path(path) for path in paths]
+
+
+@case("joppy: add note")
+def joppy_add_note(context: Context):
+    notebook_id = context.api.add_notebook(title="add note")
+    return lambda: context.api.add_note(title="note", parent_id=notebook_id)
+
+
+@case("joppy: list notes")
+def joppy_list_notes(context: Context):
+    return lambda: context.api.get_all_notes(fields="id,parent_id")
+
+
+@case("joppy: list notebooks")
+def joppy_list_notebooks(context: Context):
+    return lambda: context.api.get_all_notebooks(fields="id,parent_id")
+
+
+@case("count: notes")
+def count_notes(context: Context):
+    mirror = StateMirror(context.api)
+    mirror.note_count()
+    notebook_id = context.api.add_notebook(title="count notes")
+
+    def run():
+        # One change per count, like in the tests.
+        context.api.add_note(title="note", parent_id=notebook_id)
+        mirror.note_count()
+
+    return run
+
+
+@case("count: notebooks")
+def count_notebooks(context: Context):
+    mirror = StateMirror(context.api)
+    return mirror.notebook_count
+
+
+@case("count: tags")
+def count_tags(context: Context):
+    mirror = StateMirror(context.api)
+    return mirror.tag_count
+
+
+def summarize(durations: List[float]) -> dict:
+    ordered = sorted(durations)
+    return {
+        "samples": len(ordered),
+        "mean": statistics.mean(ordered),
+        "stdev": statistics.stdev(ordered),
+        "median": statistics.median(ordered),
+        "min": ordered[0],
+        "p95": stats.percentile(ordered, 0.95),
+    }
+
+
+def measure(operation: Callable, warmup: int, samples: int) -> List[float]:
+    for _ in range(warmup):
+        operation()
+    durations = []
+    for _ in range(samples):
+        t_start = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - t_start)
+    return durations
+
+
+def welch(current: dict, baseline: dict):
+    """
+    Welch's t-test of the means. The p-value is approximated by the normal
+    distribution, which is close enough for the default amount of samples.
+    """
+    variance = (
+        current["stdev"] ** 2 / current["samples"]
+        + baseline["stdev"] ** 2 / baseline["samples"]
+    )
+    if variance == 0:
+        return 0.0, 1.0
+    t_value = (current["mean"] - baseline["mean"]) / math.sqrt(variance)
+    p_value = 2 * (1 - statistics.NormalDist().cdf(abs(t_value)))
+    return t_value, p_value
+
+
+def compare(results: dict, baseline: dict, alpha: float, threshold: float) -> bool:
+    """Print the changes against the baseline. Return whether anything regressed."""
+    regressed = False
+    print(f"{'case':30} | {'change':>7} | {'p':>6} | verdict")
+    for name, current in results["cases"].items():
+        if name not in baseline["cases"]:
+            print(f"{name:30} | {'':>7} | {'':>6} | new")
+            continue
+        previous = baseline["cases"][name]
+        change = current["mean"] / previous["mean"] - 1
+        _, p_value = welch(current, previous)
+        verdict = "same"
+        if p_value < alpha and abs(change) > threshold:
+            verdict = "slower" if change > 0 else "faster"
+            regressed |= change > 0
+        print(f"{name:30} | {change:+7.1%} | {p_value:6.3f} | {verdict}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Stand-in latency in seconds."
+    )
+    parser.add_argument("--notebooks", type=int, default=10)
+    parser.add_argument("--notes-per-notebook", type=int, default=20)
+    parser.add_argument("--tags", type=int, default=10)
+    parser.add_argument("--case", nargs="+", help="Run a subset of cases.")
+    parser.add_argument("--output", type=str, help="Write the results as JSON.")
+    parser.add_argument("--baseline", type=str, help="Compare against the results.")
+    parser.add_argument("--alpha", type=float, default=0.01, help="Significance level.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Ignore relative changes of the mean below the threshold.",
+    )
+    args = parser.parse_args()
+
+    results = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "parameters": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "baseline", "alpha", "threshold")
+        },
+        "cases": {},
+    }
+    with FakeDataApi(latency=args.latency) as data_api, FakeWebDriver(
+        latency=args.latency
+    ) as web_driver:
+        context = Context(data_api, web_driver, args.seed)
+        context.populate(args.notebooks, args.notes_per_notebook, args.tags)
+        try:
+            for name, setup in CASES.items():
+                if args.case and name not in args.case:
+                    continue
+                durations = measure(setup(context), args.warmup, args.samples)
+                results["cases"][name] = summarize(durations)
+                print(f"{name:30} | {results['cases'][name]['median'] * 1000:9.3f} ms")
+        finally:
+            context.close()
+
+    if args.output is not None:
+        with open(args.output, "w") as outfile:
+            json.dump(results, outfile, indent=2, sort_keys=True)
+    if args.baseline is not None:
+        with open(args.baseline) as infile:
+            baseline = json.load(infile)
+        if compare(results, baseline, args.alpha, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
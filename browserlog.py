@@ -0,0 +1,142 @@
+"""
+Collect the browser and performance log continuously in the background.
+Chromedriver clears its buffer at each request, so the entries are assigned
+to the running test by their timestamp.
+"""
+
+import collections
+import json
+import logging
+import threading
+import time
+from typing import Deque, Dict, List, Optional
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+import urllib3
+
+LOG_TYPES = ("browser", "performance")
+
+
+def now_ms() -> float:
+    # Chromedriver uses milliseconds since epoch for the timestamps.
+    return time.time() * 1000
+
+
+class LogWindow:  # pylint: disable=too-few-public-methods
+    """Log entries of a single test. Each log type is limited separately."""
+
+    def __init__(self, test_id: str, entries: int):
+        self.test_id = test_id
+        self.start = now_ms()
+        self.end: Optional[float] = None
+        self.logs: Dict[str, Deque[dict]] = {
+            log_type: collections.deque(maxlen=entries) for log_type in LOG_TYPES
+        }
+
+
+class LogCollector:
+    """
+    Drain the chromedriver logs in a background thread. It has its own connection,
+    so that the tests don't have to wait for it.
+    """
+
+    def __init__(
+        self, driver, interval: float = 0.5, tests: int = 20, entries: int = 1000
+    ):
+        self.driver = driver
+        self.connection = RemoteConnection(
+            driver.command_executor._url,  # pylint: disable=protected-access
+            keep_alive=True,
+        )
+        self.interval = interval
+        self.entries = entries
+        # Only the latest tests are kept. Memory usage is bounded by
+        # tests * entries * len(LOG_TYPES).
+        self.windows: Deque[LogWindow] = collections.deque(maxlen=tests)
+        self.dropped = 0  # entries outside of any test
+
+        self.condition = threading.Condition()
+        self.drained_until = 0.0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start_test(self, test_id: str):
+        with self.condition:
+            self.windows.append(LogWindow(test_id, self.entries))
+
+    def end_test(self, test_id: str):
+        with self.condition:
+            for window in reversed(self.windows):
+                if window.test_id == test_id and window.end is None:
+                    window.end = now_ms()
+                    break
+
+    def fetch(self, log_type: str) -> List[dict]:
+        response = self.connection.execute(
+            Command.GET_LOG, {"sessionId": self.driver.session_id, "type": log_type}
+        )
+        ErrorHandler().check_response(response)
+        return response["value"]
+
+    def assign(self, log_type: str, entry: dict):
+        for window in reversed(self.windows):
+            if window.start <= entry["timestamp"] and (
+                window.end is None or entry["timestamp"] < window.end
+            ):
+                window.logs[log_type].append(entry)
+                return
+        self.dropped += 1
+
+    def drain(self):
+        started = now_ms()
+        fetched = {log_type: self.fetch(log_type) for log_type in LOG_TYPES}
+        with self.condition:
+            for log_type, entries in fetched.items():
+                for entry in entries:
+                    self.assign(log_type, entry)
+            self.drained_until = started
+            self.condition.notify_all()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                self.drain()
+            except (WebDriverException, urllib3.exceptions.HTTPError) as error:
+                # For example while the app is restarted.
+                logging.debug(f"Log collector: draining failed ({error})")
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        self.connection.close()
+
+    def get_entries(self, test_id: str, log_type: str) -> List[dict]:
+        with self.condition:
+            for window in reversed(self.windows):
+                if window.test_id == test_id:
+                    return list(window.logs[log_type])
+        return []
+
+    def write(self, test_id: str, base_name: str, timeout: float = 5):
+        """
+        Write the logs of a test, as soon as they are drained. Should be called
+        in the background.
+        """
+        end = now_ms()
+        with self.condition:
+            if not self.condition.wait_for(
+                lambda: self.drained_until >= end, timeout=timeout
+            ):
+                logging.warning(f"Log collector: logs of {test_id} may be incomplete")
+        with open(f"{base_name}_browser_log.txt", "w") as outfile:
+            for entry in self.get_entries(test_id, "browser"):
+                outfile.write(f"{entry}\n")
+        with open(f"{base_name}_performance_log.jsonl", "w") as outfile:
+            for entry in self.get_entries(test_id, "performance"):
+                outfile.write(f"{json.dumps(entry)}\n")
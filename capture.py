@@ -0,0 +1,84 @@
+"""
+Capture debug artifacts of failed tests. Only the cheap grabs are done on the
+test thread. Encoding and writing is done in the background.
+"""
+
+import base64
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import os
+import threading
+from typing import Callable, List
+
+from PIL import Image, ImageGrab
+
+# Only used by the lossy formats.
+SCREENSHOT_QUALITY = 80
+
+
+def screenshot_format() -> str:
+    """
+    Format of the app screenshots: "png", "jpeg" or "webp". Read at call time,
+    since the runner sets the variable after the import.
+    """
+    return os.getenv("TEST_SCREENSHOT_FORMAT", "png")
+
+
+class CapturePool:
+    """Background workers to encode and write the artifacts."""
+
+    def __init__(self, workers: int = 2):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="capture"
+        )
+        self.lock = threading.Lock()
+        self.pending: List[Future] = []
+
+    def submit(self, func: Callable, *args):
+        with self.lock:
+            self.pending.append(self.executor.submit(func, *args))
+
+    def flush(self):
+        """Wait until all artifacts are written."""
+        with self.lock:
+            pending, self.pending = self.pending, []
+        for future in pending:
+            try:
+                future.result()
+            except Exception as error:  # pylint: disable=broad-except
+                # A missing artifact shouldn't break the test run.
+                logging.warning(f"Capture: writing an artifact failed ({error})")
+        logging.debug(f"Capture: flushed {len(pending)} artifacts")
+
+
+pool = CapturePool()
+
+
+def write_bytes(path: str, data: bytes):
+    with open(path, "wb") as outfile:
+        outfile.write(data)
+
+
+def write_base64(path: str, data: str):
+    write_bytes(path, base64.b64decode(data))
+
+
+def write_image(path: str, image: Image.Image):
+    image.save(path, "PNG")
+
+
+def capture_app(execute_cdp: Callable, base_name: str):
+    """Screenshot of the app by the devtools protocol. It's encoded by chrome."""
+    format_ = screenshot_format()
+    params = {"format": format_}
+    if format_ != "png":
+        params["quality"] = SCREENSHOT_QUALITY
+    # Only base64 is transferred. Decoding is done in the background.
+    data = execute_cdp("Page.captureScreenshot", params)["data"]
+    extension = "jpg" if format_ == "jpeg" else format_
+    pool.submit(write_base64, f"{base_name}_webdriver.{extension}", data)
+
+
+def capture_screen(base_name: str):
+    """Copy of the raw xvfb framebuffer. PNG encoding is done in the background."""
+    pool.submit(write_image, f"{base_name}_xvfb.png", ImageGrab.grab())
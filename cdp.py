@@ -0,0 +1,132 @@
+"""
+Client for the chrome devtools protocol. It talks to the renderer by a persistent
+websocket, without the chromedriver in between.
+See: https://chromedevtools.github.io/devtools-protocol/
+"""
+
+import itertools
+import json
+import logging
+import threading
+from typing import Optional
+
+import requests
+import websocket
+
+# Key definitions for "Input.dispatchKeyEvent": key, code and windows key code.
+KEYS = {
+    "esc": ("Escape", "Escape", 27),
+    "enter": ("Enter", "Enter", 13),
+    "tab": ("Tab", "Tab", 9),
+    "backspace": ("Backspace", "Backspace", 8),
+    "up": ("ArrowUp", "ArrowUp", 38),
+    "down": ("ArrowDown", "ArrowDown", 40),
+    "left": ("ArrowLeft", "ArrowLeft", 37),
+    "right": ("ArrowRight", "ArrowRight", 39),
+}
+MODIFIERS = {"alt": 1, "ctrl": 2, "meta": 4, "shift": 8}
+
+
+class CdpError(Exception):
+    pass
+
+
+class Selector:  # pylint: disable=too-few-public-methods
+    """Script argument that references an element of the page by a CSS selector."""
+
+    def __init__(self, css: str):
+        self.css = css
+
+    def expression(self) -> str:
+        return f"document.querySelector({json.dumps(self.css)})"
+
+
+def find_page(debugger_address: str, url: Optional[str] = None) -> str:
+    """
+    Get the websocket URL of the page with the given URL. Else use the first page.
+    """
+    targets = requests.get(f"http://{debugger_address}/json", timeout=5).json()
+    pages = [target for target in targets if target["type"] == "page"]
+    if not pages:
+        raise CdpError(f"No page found at {debugger_address}")
+    for page in pages:
+        if page["url"] == url:
+            return page["webSocketDebuggerUrl"]
+    return pages[0]["webSocketDebuggerUrl"]
+
+
+def build_call(script: str, args) -> str:
+    """Expression to call a function body with the arguments."""
+    arguments = ", ".join(
+        arg.expression() if isinstance(arg, Selector) else json.dumps(arg)
+        for arg in args
+    )
+    return f"(function() {{{script}}})({arguments})"
+
+
+class CdpSession:
+    """Send commands to a page and wait for their results."""
+
+    def __init__(self, websocket_url: str, timeout: float = 10):
+        logging.debug(f"CDP: connect to {websocket_url}")
+        self.websocket = websocket.create_connection(
+            websocket_url,
+            timeout=timeout,
+            suppress_origin=True,
+            # The validation in pure python takes longer than the transfer.
+            skip_utf8_validation=True,
+        )
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def send(self, method: str, params: Optional[dict] = None) -> dict:
+        with self.lock:
+            id_ = next(self.ids)
+            self.websocket.send(
+                json.dumps({"id": id_, "method": method, "params": params or {}})
+            )
+            while True:
+                message = json.loads(self.websocket.recv())
+                # Skip events, in case any domain was enabled.
+                if message.get("id") == id_:
+                    break
+        if "error" in message:
+            raise CdpError(f"{method}: {message['error']}")
+        return message["result"]
+
+    def execute_script(self, script: str, *args):
+        """
+        Like "driver.execute_script()": The script is a function body that gets
+        the arguments. Elements have to be passed as selector.
+        """
+        result = self.send(
+            "Runtime.evaluate",
+            {
+                "expression": build_call(script, args),
+                "returnByValue": True,
+                "awaitPromise": True,
+            },
+        )
+        if "exceptionDetails" in result:
+            raise CdpError(result["exceptionDetails"]["text"])
+        return result["result"].get("value")
+
+    def press(self, key: str, modifiers: int = 0):
+        """Press a key inside of the page. Menu accelerators aren't triggered."""
+        name, code, key_code = KEYS.get(key, (key, f"Key{key.upper()}", None))
+        event = {"key": name, "code": code, "modifiers": modifiers}
+        if key_code is None:
+            key_code = ord(key.upper())
+            if not modifiers:
+                event["text"] = key
+        event["windowsVirtualKeyCode"] = key_code
+        self.send("Input.dispatchKeyEvent", {"type": "keyDown", **event})
+        self.send("Input.dispatchKeyEvent", {"type": "keyUp", **event})
+
+    def hotkey(self, *keys: str):
+        """Press a key with modifiers, for example hotkey("ctrl", "a")."""
+        *modifiers, key = keys
+        self.press(key, modifiers=sum(MODIFIERS[modifier] for modifier in modifiers))
+
+    def close(self):
+        self.websocket.close()
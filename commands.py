@@ -0,0 +1,48 @@
+"""
+Run joplin commands directly in the renderer. No OS level input is needed,
+so this is the fastest way for actions that aren't tested themselves.
+"""
+
+import logging
+from typing import Optional
+
+from driver import driver
+
+
+EXECUTE_COMMAND_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const [name, args] = arguments;
+const CommandService = require("@joplin/lib/services/CommandService").default;
+CommandService.instance()
+  .execute(name, ...args)
+  .then(() => done(null), (error) => done(String(error)));
+"""
+
+# The zoom isn't a command, but a setting.
+ZOOM_SCRIPT = """
+const [step] = arguments;
+const Setting = require("@joplin/lib/models/Setting").default;
+if (step === null) {
+  Setting.setValue("windowContentZoomFactor", 100);
+} else {
+  Setting.incValue("windowContentZoomFactor", step);
+}
+"""
+
+
+class CommandError(Exception):
+    pass
+
+
+def execute(name: str, *args):
+    """Execute a command of the joplin command service, like "toggleSideBar"."""
+    logging.debug(f"Command: {name} {args}")
+    error = driver.execute_async_script(EXECUTE_COMMAND_SCRIPT, name, list(args))
+    if error is not None:
+        raise CommandError(f"Command {name} failed: {error}")
+
+
+def zoom(step: Optional[int]):
+    """Change the zoom by the step in percent. Reset it if the step is None."""
+    logging.debug(f"Command: zoom {step}")
+    driver.execute_script(ZOOM_SCRIPT, step)
@@ -0,0 +1,52 @@
+"""
+Checks that are evaluated in the renderer. Only the result and a short
+description of the involved elements are transferred, instead of their markup.
+"""
+
+from typing import Tuple
+
+
+# Short CSS like description of an element, for example "div.rli-sideBar".
+DESCRIBE = """
+const describe = (element) => {
+  if (element === null || element === undefined) return "none";
+  const id = element.id ? `#${element.id}` : "";
+  const classes = [...element.classList].map((name) => `.${name}`).join("");
+  return `${element.tagName.toLowerCase()}${id}${classes}`;
+};
+"""
+
+CONTAINS_SCRIPT = (
+    DESCRIBE
+    + """
+const [container, element] = arguments;
+return [
+  element !== null && container.contains(element),
+  `${describe(element)} in ${describe(container)}`,
+];
+"""
+)
+
+FOCUS_WITHIN_SCRIPT = (
+    DESCRIBE
+    + """
+const [container] = arguments;
+const active = document.activeElement;
+return [
+  active !== null && container.contains(active),
+  `focus on ${describe(active)}, expected in ${describe(container)}`,
+];
+"""
+)
+
+
+def contains(driver, container, element) -> Tuple[bool, str]:
+    """Check whether an element is inside of a container."""
+    result, description = driver.execute_script(CONTAINS_SCRIPT, container, element)
+    return result, description
+
+
+def focus_within(driver, container) -> Tuple[bool, str]:
+    """Check whether the focussed element is inside of a container."""
+    result, description = driver.execute_script(FOCUS_WITHIN_SCRIPT, container)
+    return result, description
@@ -0,0 +1,188 @@
+"""
+Content-addressed cache for downloaded binaries. It is shared by all checkouts
+and workers. Downloads are streamed, resumable and installed atomically.
+Unpacked and extracted binaries are cached, too.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
+from typing import Optional
+import zipfile
+
+import requests
+
+CACHE_DIR = os.path.join(
+    os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "joplin-ui-tests"
+)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class ChecksumError(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def file_lock(path: str):
+    """Exclusive lock across processes, for example parallel workers."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as lockfile:
+        fcntl.flock(lockfile, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lockfile, fcntl.LOCK_UN)
+
+
+def write_atomic(path: str, content: str):
+    with tempfile.NamedTemporaryFile(
+        "w", dir=os.path.dirname(path), delete=False
+    ) as outfile:
+        outfile.write(content)
+    os.replace(outfile.name, path)
+
+
+def make_executable(path: str):
+    if not os.access(path, os.X_OK):
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as infile:
+        for chunk in iter(lambda: infile.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download_partial(url: str, path: str, timeout: float = 30) -> str:
+    """
+    Download in chunks with constant memory usage. Continue a previous,
+    interrupted download if possible. Return the SHA256 of the complete file.
+    """
+    digest = hashlib.sha256()
+    offset = 0
+    if os.path.exists(path):
+        # Hash the existing part, so that the file doesn't have to be read twice.
+        with open(path, "rb") as infile:
+            for chunk in iter(lambda: infile.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                offset += len(chunk)
+
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416:
+            # The range can't be satisfied. Start from scratch.
+            os.remove(path)
+            return download_partial(url, path, timeout=timeout)
+        response.raise_for_status()
+        if offset and response.status_code != 206:
+            # Server doesn't support ranges and sends the full file.
+            logging.debug(f"Download: {url} can't be resumed")
+            digest = hashlib.sha256()
+            offset = 0
+        elif offset:
+            logging.debug(f"Download: resume {url} at {offset} bytes")
+        with open(path, "ab" if offset else "wb") as outfile:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                digest.update(chunk)
+                outfile.write(chunk)
+    return digest.hexdigest()
+
+
+def fetch(url: str, sha256: Optional[str] = None, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Get a file from the cache or download it. If no checksum is given, the checksum
+    of the first download is recorded and used afterwards. A given checksum takes
+    priority over the recorded one.
+    """
+    key = hashlib.sha256(url.encode()).hexdigest()
+    index_file = f"{cache_dir}/urls/{key}"
+    for directory in ("objects", "urls", "partial"):
+        os.makedirs(f"{cache_dir}/{directory}", exist_ok=True)
+
+    with file_lock(f"{cache_dir}/locks/{key}"):
+        if os.path.exists(index_file):
+            with open(index_file) as infile:
+                recorded = infile.read().strip()
+            if sha256 is None:
+                sha256 = recorded
+            elif sha256 != recorded:
+                # The checksum was pinned after recording. Drop the stale entry.
+                logging.warning(f"Download: {url} recorded {recorded}, pinned {sha256}")
+                os.remove(index_file)
+        object_file = f"{cache_dir}/objects/{sha256}"
+        if sha256 is not None and os.path.exists(object_file):
+            # The object may be corrupted or truncated since it was stored.
+            if hash_file(object_file) == sha256:
+                logging.debug(f"Download: {url} cached as {sha256}")
+                if not os.path.exists(index_file):
+                    write_atomic(index_file, sha256)
+                return object_file
+            logging.warning(f"Download: cached {url} is corrupted. Download again.")
+            os.remove(object_file)
+
+        logging.debug(f"Download: {url}")
+        partial_file = f"{cache_dir}/partial/{key}"
+        digest = download_partial(url, partial_file)
+        if sha256 is not None and digest != sha256:
+            os.remove(partial_file)
+            raise ChecksumError(f"{url}: downloaded {digest}, expected {sha256}")
+        if sha256 is None:
+            logging.warning(f"Download: {url} isn't pinned. Its SHA256 is {digest}.")
+
+        object_file = f"{cache_dir}/objects/{digest}"
+        os.replace(partial_file, object_file)
+        write_atomic(index_file, digest)
+        return object_file
+
+
+def unpack(archive: str, member: str, cache_dir: str = CACHE_DIR) -> str:
+    """Extract a single member of a zip archive once and return its path."""
+    # The archive is content-addressed, so its name identifies the content.
+    destination = f"{cache_dir}/unpacked/{os.path.basename(archive)}"
+    with file_lock(f"{cache_dir}/locks/unpack_{os.path.basename(archive)}"):
+        if not os.path.exists(f"{destination}/{member}"):
+            # Remove the leftovers of an incomplete extraction, if any.
+            shutil.rmtree(destination, ignore_errors=True)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            tmpdir = tempfile.mkdtemp(dir=os.path.dirname(destination))
+            with zipfile.ZipFile(archive) as zip_file:
+                zip_file.extract(member, path=tmpdir)
+            os.replace(tmpdir, destination)
+    return f"{destination}/{member}"
+
+
+def extract_appimage(appimage: str, key: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Extract an AppImage once and return the path of its executable. Starting the
+    extracted app avoids mounting and decompressing the image at each start.
+    """
+    destination = f"{cache_dir}/extracted/{key}"
+    with file_lock(f"{cache_dir}/locks/extract_{key}"):
+        if not os.path.exists(f"{destination}/AppRun"):
+            shutil.rmtree(destination, ignore_errors=True)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            tmpdir = tempfile.mkdtemp(dir=os.path.dirname(destination))
+            logging.debug(f"Extract: {appimage} to {destination}")
+            subprocess.run(
+                [appimage, "--appimage-extract"],
+                cwd=tmpdir,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            os.replace(f"{tmpdir}/squashfs-root", destination)
+            os.rmdir(tmpdir)
+
+    # Start the electron binary directly, instead of the wrapper script.
+    for executable in ("@joplinapp-desktop", "joplin"):
+        if os.access(f"{destination}/{executable}", os.X_OK):
+            return f"{destination}/{executable}"
+    return f"{destination}/AppRun"
@@ -3,17 +3,73 @@ Helper module to load and start the chromedriver only once,
 even when used in multiple modules.
 """
 
-import io
+import json
+import logging
 import os
+import secrets
 import shutil
-import stat
-import zipfile
+from typing import Callable, Optional
 
 import requests
 from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+import websocket
 
+import cdp
+import downloads
+from versions import (
+    CHROMEDRIVER_SHA256,
+    CHROMEDRIVER_VERSION,
+    JOPLIN_SHA256,
+    JOPLIN_VERSION,
+)
+
+
+# Binaries are shared by all workers, so don't resolve them relative to the cwd.
+BIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bin")
+
+# Chromedriver appends "--remote-debugging-port=0" to the arguments. It is consumed
+# by "--profile", so this is the actual profile directory, relative to the cwd.
+PROFILE_DIR = os.path.abspath("--remote-debugging-port=0")
+
+# Port of the data API. Only forced if set explicitly, for example by a test worker.
+API_PORT = int(os.getenv("JOPLIN_API_PORT", "41184"))
+
+# How to activate the data API:
+# - "ui": Enable it in the options and read the token from there.
+# - "settings": Write the token and the enabled server into the fresh profile.
+API_SETUP = os.getenv("JOPLIN_API_SETUP", "ui")
+# The token has 128 hex characters, like the tokens generated by joplin.
+API_TOKEN = os.getenv("JOPLIN_API_TOKEN", secrets.token_hex(64))
 
-def download_chromedriver(destination: str = "./bin/chromedriver"):
+# Talk to the renderer by the devtools protocol for frequent operations,
+# instead of going through the chromedriver. The webdriver is the fallback.
+CDP_BACKEND = os.getenv("JOPLIN_CDP_BACKEND") == "1"
+
+# Start joplin from the extracted AppImage, instead of mounting it at each start.
+EXTRACT_APPIMAGE = os.getenv("JOPLIN_EXTRACT_APPIMAGE") == "1"
+
+
+def write_settings(settings: dict, profile_dir: str = PROFILE_DIR):
+    """
+    Merge settings into the settings file of the profile.
+    They are applied at the next app start.
+    """
+    os.makedirs(profile_dir, exist_ok=True)
+    settings_file = f"{profile_dir}/settings.json"
+    merged = {"$schema": "https://joplinapp.org/schema/settings.json"}
+    if os.path.exists(settings_file):
+        with open(settings_file) as infile:
+            merged.update(json.load(infile))
+    merged.update(settings)
+    with open(settings_file, "w") as outfile:
+        json.dump(merged, outfile, indent=4)
+
+
+def download_chromedriver(destination: str = f"{BIN_DIR}/chromedriver"):
     """
     Electron app uses chrome 102.0.5005.61. Download the corresponding chromedriver.
     How to obtain the correct chromedriver version for an electron app:
@@ -24,77 +80,192 @@ def download_chromedriver(destination: str = "./bin/chromedriver"):
        https://chromedriver.chromium.org/downloads
     """
     if not os.path.exists(destination):
-        response = requests.get(
-            "https://chromedriver.storage.googleapis.com/102.0.5005.61/"
+        # Use the shared cache, if there is no binary provided.
+        archive = downloads.fetch(
+            f"https://chromedriver.storage.googleapis.com/{CHROMEDRIVER_VERSION}/"
             "chromedriver_linux64.zip",
-            timeout=30,
+            sha256=CHROMEDRIVER_SHA256,
         )
-        response.raise_for_status()
-        with zipfile.ZipFile(io.BytesIO(response.content)) as chromedriver_zip:
-            chromedriver_zip.extract("chromedriver", path="./bin")
-    if not os.access(destination, os.X_OK):
-        # readd the executable flag
-        os.chmod(destination, os.stat(destination).st_mode | stat.S_IEXEC)
+        destination = downloads.unpack(archive, "chromedriver")
+    # readd the executable flag
+    downloads.make_executable(destination)
     return destination
 
 
-def download_joplin(destination: str = "./bin/joplin.AppImage"):
+def download_joplin(
+    destination: str = f"{BIN_DIR}/joplin.AppImage",
+    extract: bool = EXTRACT_APPIMAGE,
+):
     if not os.path.exists(destination):
         # TODO: How to download the latest release?
-        response = requests.get(
-            "https://github.com/laurent22/joplin/releases/download/v2.9.17/"
-            "Joplin-2.9.17.AppImage",
-            timeout=30,
+        destination = downloads.fetch(
+            f"https://github.com/laurent22/joplin/releases/download/v{JOPLIN_VERSION}/"
+            f"Joplin-{JOPLIN_VERSION}.AppImage",
+            sha256=JOPLIN_SHA256,
         )
-        response.raise_for_status()
-        with open(destination, "wb") as outfile:
-            outfile.write(response.content)
-    if not os.access(destination, os.X_OK):
-        # readd the executable flag
-        os.chmod(destination, os.stat(destination).st_mode | stat.S_IEXEC)
-    return os.getcwd() + "/" + destination
+    # readd the executable flag
+    downloads.make_executable(destination)
+    if extract:
+        return downloads.extract_appimage(destination, f"joplin-{JOPLIN_VERSION}")
+    return destination
 
 
 chromedriver_service = webdriver.chrome.service.Service(download_chromedriver())
 chromedriver_service.start()
 
 # delete previous profile and start with a fresh one
-shutil.rmtree("--remote-debugging-port=0", ignore_errors=True)
+shutil.rmtree(PROFILE_DIR, ignore_errors=True)
+if API_SETUP == "settings":
+    write_settings(
+        {
+            "api.port": API_PORT,
+            "api.token": API_TOKEN,
+            "clipperServer.autoStart": True,
+        }
+    )
+elif "JOPLIN_API_PORT" in os.environ:
+    # Parallel workers need distinct ports. Else the first free port is used.
+    write_settings({"api.port": API_PORT})
+
+CAPABILITIES = {
+    # The logs are drained continuously by the tests.
+    "goog:loggingPrefs": {"browser": "ALL", "performance": "ALL"},
+    "goog:chromeOptions": {
+        "binary": download_joplin(),
+        # TODO: How to forward a correct profile to the app through webdriver?
+        # https://stackoverflow.com/q/69180856/7410886
+        "args": ["--profile", "--no-welcome"],
+        # needed to avoid "unknown flag" errors
+        # https://stackoverflow.com/a/51350140/7410886
+        # https://source.chromium.org/chromium/chromium/src/+/main:chrome/test/chromedriver/chrome_launcher.cc;l=188
+        "excludeSwitches": [
+            "allow-pre-commit-input",
+            "disable-background-networking",
+            "disable-client-side-phishing-detection",
+            "disable-default-apps",
+            "disable-hang-monitor",
+            "disable-popup-blocking",
+            "disable-prompt-on-repost",
+            "disable-sync",
+            "enable-automation",
+            "enable-blink-features",
+            "log-level",
+            "no-first-run",
+            "no-service-autorun",
+            "password-store",
+            "test-type",
+            "use-mock-keychain",
+            "user-data-dir",
+        ],
+    },
+}
 
 # https://www.selenium.dev/selenium/docs/api/py/webdriver_remote/selenium.webdriver.remote.webdriver.html#module-selenium.webdriver.remote.webdriver
 driver = webdriver.remote.webdriver.WebDriver(
     command_executor=chromedriver_service.service_url,
-    desired_capabilities={
-        "goog:chromeOptions": {
-            "binary": download_joplin(),
-            # TODO: How to forward a correct profile to the app through webdriver?
-            # https://stackoverflow.com/q/69180856/7410886
-            "args": ["--profile", "--no-welcome"],
-            # needed to avoid "unknown flag" errors
-            # https://stackoverflow.com/a/51350140/7410886
-            # https://source.chromium.org/chromium/chromium/src/+/main:chrome/test/chromedriver/chrome_launcher.cc;l=188
-            "excludeSwitches": [
-                "allow-pre-commit-input",
-                "disable-background-networking",
-                "disable-client-side-phishing-detection",
-                "disable-default-apps",
-                "disable-hang-monitor",
-                "disable-popup-blocking",
-                "disable-prompt-on-repost",
-                "disable-sync",
-                "enable-automation",
-                "enable-blink-features",
-                "log-level",
-                "no-first-run",
-                "no-service-autorun",
-                "password-store",
-                "test-type",
-                "use-mock-keychain",
-                "user-data-dir",
-            ],
-        },
-    },
+    desired_capabilities=CAPABILITIES,
 )
+# The chrome devtools protocol isn't part of the webdriver standard.
+# Chromedriver provides it anyway.
+driver.command_executor._commands[  # pylint: disable=protected-access
+    "executeCdpCommand"
+] = ("POST", "/session/$sessionId/goog/cdp/execute")
+
+
+cdp_session: Optional[cdp.CdpSession] = None
+# Errors of the connection to the renderer. The webdriver is used instead.
+CDP_CONNECTION_ERRORS = (
+    OSError,
+    requests.RequestException,
+    websocket.WebSocketException,
+)
+
+
+def connect_cdp():
+    """Connect directly to the renderer of the current session."""
+    global cdp_session  # pylint: disable=global-statement
+
+    if cdp_session is not None:
+        cdp_session.close()
+        cdp_session = None
+    try:
+        address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        page = cdp.find_page(address, url=driver.current_url)
+        cdp_session = cdp.CdpSession(page)
+    except (KeyError, cdp.CdpError, *CDP_CONNECTION_ERRORS) as error:
+        logging.warning(f"CDP: connection failed ({error}). Use the webdriver.")
+
+
+def disconnect_cdp(error: Exception):
+    global cdp_session  # pylint: disable=global-statement
+
+    logging.warning(f"CDP: connection lost ({error}). Use the webdriver.")
+    cdp_session = None
+
+
+def execute_cdp(cmd: str, params: Optional[dict] = None) -> dict:
+    """Execute a chrome devtools protocol command and return its result."""
+    if cdp_session is not None:
+        try:
+            return cdp_session.send(cmd, params)
+        except CDP_CONNECTION_ERRORS as error:
+            disconnect_cdp(error)
+    arguments = {"cmd": cmd, "params": params or {}}
+    return driver.execute("executeCdpCommand", arguments)["value"]
+
+
+def execute_script(script: str, *args):
+    """
+    Execute a script in the renderer. Elements have to be passed as
+    "cdp.Selector", since they are referenced differently by both backends.
+    """
+    if cdp_session is not None:
+        try:
+            return cdp_session.execute_script(script, *args)
+        except CDP_CONNECTION_ERRORS as error:
+            disconnect_cdp(error)
+    return driver.execute_script(f"return {cdp.build_call(script, args)};")
+
+
+def press_in_page(key: str) -> bool:
+    """
+    Press a key inside of the page, if connected to the renderer.
+    Return whether the key was pressed.
+    """
+    if cdp_session is not None:
+        try:
+            cdp_session.press(key)
+            return True
+        except CDP_CONNECTION_ERRORS as error:
+            disconnect_cdp(error)
+    return False
+
+
+if CDP_BACKEND:
+    connect_cdp()
+
+
+def wait_until_loaded(timeout: int = 10):
+    """Wait until an element has loaded to continue."""
+    WebDriverWait(driver, timeout).until(
+        EC.presence_of_element_located((By.CLASS_NAME, "rli-sideBar"))
+    )
+
+
+def restart_session(while_stopped: Optional[Callable[[], None]] = None):
+    """
+    Restart the app. The webdriver object is reused, so that all references to it
+    stay valid. References to elements get stale.
+    """
+    logging.debug("Restarting the app")
+    driver.execute(Command.QUIT)
+    if while_stopped is not None:
+        while_stopped()
+    driver.start_session(CAPABILITIES)
+    wait_until_loaded()
+    if CDP_BACKEND:
+        connect_cdp()
+
 
 # TODO: How to properly download/export?
 # This seems to be not the usual chrome download.
@@ -0,0 +1,122 @@
+"""
+Measure the frame times while scrolling a list inside the renderer. The amount
+of rendered nodes shows, whether the list is virtualized.
+"""
+
+import logging
+from typing import List
+
+import stats
+
+# Expected frame time at 60 Hz in ms.
+FRAME_BUDGET = 1000 / 60
+
+# Scroll the first scrollable element inside the root at a constant speed,
+# one step per frame. Stop at the end of the list or after the maximum duration.
+SCROLL_SCRIPT = """
+const [rootSelector, speed, maxDuration, done] = arguments;
+
+function isScrollable(element) {
+  const overflow = window.getComputedStyle(element).overflowY;
+  return (
+    (overflow === "auto" || overflow === "scroll") &&
+    element.scrollHeight > element.clientHeight
+  );
+}
+
+const root = document.querySelector(rootSelector);
+const scroller = [root, ...root.querySelectorAll("*")].find(isScrollable);
+if (scroller === undefined) {
+  done({ error: `Nothing to scroll in ${rootSelector}` });
+  return;
+}
+scroller.scrollTop = 0;
+
+const frameTimes = [];
+const longTasks = [];
+let maxNodes = 0;
+let observer = null;
+if (PerformanceObserver.supportedEntryTypes.includes("longtask")) {
+  observer = new PerformanceObserver((list) => {
+    longTasks.push(...list.getEntries().map((entry) => entry.duration));
+  });
+  observer.observe({ type: "longtask" });
+}
+
+function finish() {
+  if (observer !== null) {
+    longTasks.push(...observer.takeRecords().map((entry) => entry.duration));
+    observer.disconnect();
+  }
+  done({
+    error: null,
+    frameTimes: frameTimes,
+    longTasks: longTasks,
+    longTasksSupported: observer !== null,
+    distance: scroller.scrollTop,
+    scrollHeight: scroller.scrollHeight,
+    maxNodes: maxNodes,
+  });
+}
+
+let start = null;
+let last = null;
+function step(now) {
+  if (start === null) {
+    start = now;
+  } else {
+    frameTimes.push(now - last);
+  }
+  last = now;
+  maxNodes = Math.max(maxNodes, scroller.getElementsByTagName("*").length);
+
+  const elapsed = now - start;
+  scroller.scrollTop = (speed * elapsed) / 1000;
+  const atEnd =
+    scroller.scrollTop + scroller.clientHeight >= scroller.scrollHeight - 1;
+  if (atEnd || elapsed > maxDuration * 1000) {
+    // Give the observer the chance to report the tasks of the last frame.
+    setTimeout(finish, 0);
+  } else {
+    requestAnimationFrame(step);
+  }
+}
+requestAnimationFrame(step);
+"""
+
+
+class FrameRateError(Exception):
+    pass
+
+
+def dropped_frames(frame_times: List[float]) -> int:
+    """Frames that were skipped, because a frame took longer than the budget."""
+    return sum(
+        max(0, round(frame_time / FRAME_BUDGET) - 1) for frame_time in frame_times
+    )
+
+
+def scroll(driver, root_selector: str, speed: float, max_duration: float = 5) -> dict:
+    """Scroll with the speed in px/s and summarize the frame times in ms."""
+    result = driver.execute_async_script(
+        SCROLL_SCRIPT, root_selector, speed, max_duration
+    )
+    if result["error"] is not None:
+        raise FrameRateError(result["error"])
+
+    frame_times = result["frameTimes"]
+    percentiles = stats.percentiles(frame_times, fractions=(0.95,))
+    summary = {
+        "frames": len(frame_times),
+        "dropped_frames": dropped_frames(frame_times),
+        "p95_frame_time": percentiles.get("p95"),
+        "long_tasks": (
+            len(result["longTasks"]) if result["longTasksSupported"] else None
+        ),
+        "long_task_time": sum(result["longTasks"]),
+        "distance": result["distance"],
+        "scroll_height": result["scrollHeight"],
+        "max_nodes": result["maxNodes"],
+    }
+    logging.debug(f"Frame rate: {root_selector} at {speed} px/s: {summary}")
+    return summary
@@ -0,0 +1,80 @@
+"""Store the durations of previous test runs to plan the next ones."""
+
+import logging
+import sqlite3
+import statistics
+import time
+from typing import Dict, Iterable, Optional
+
+from versions import JOPLIN_VERSION
+
+
+class DurationHistory:
+    """Durations of single tests, keyed by test ID and joplin version."""
+
+    def __init__(self, path: str, joplin_version: str = JOPLIN_VERSION):
+        self.joplin_version = joplin_version
+        # Parallel workers write to the same database. Wait for the lock, if needed.
+        self.connection = sqlite3.connect(path, timeout=30)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS durations ("
+                "test_id TEXT NOT NULL, "
+                "joplin_version TEXT NOT NULL, "
+                "duration REAL NOT NULL, "
+                "timestamp REAL NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS durations_by_test "
+                "ON durations (joplin_version, test_id)"
+            )
+
+    def close(self):
+        self.connection.close()
+
+    def record(self, test_id: str, duration: float):
+        logging.debug(f"History: {test_id=} took {duration:.3f} s")
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO durations VALUES (?, ?, ?, ?)",
+                (test_id, self.joplin_version, duration, time.time()),
+            )
+
+    def predict(self, last_runs: int = 5) -> Dict[str, float]:
+        """
+        Predict the duration of each known test by the median of the last runs.
+        The median ignores single outliers, like a repeated test.
+        """
+        durations: Dict[str, list] = {}
+        for test_id, duration in self.connection.execute(
+            "SELECT test_id, duration FROM durations "
+            "WHERE joplin_version = ? ORDER BY timestamp DESC",
+            (self.joplin_version,),
+        ):
+            runs = durations.setdefault(test_id, [])
+            if len(runs) < last_runs:
+                runs.append(duration)
+        return {test_id: statistics.median(runs) for test_id, runs in durations.items()}
+
+    def class_costs(
+        self, test_classes: Iterable[str], default: Optional[float] = None
+    ) -> Dict[str, float]:
+        """
+        Predict the cost of each test class, like "test_general.Go", by summing up
+        its tests. Classes without history get the median cost of the known classes.
+        """
+        predictions = self.predict()
+        costs = {}
+        for test_class in test_classes:
+            durations = [
+                duration
+                for test_id, duration in predictions.items()
+                if test_id.startswith(f"{test_class}.")
+            ]
+            if durations:
+                costs[test_class] = sum(durations)
+        if default is None:
+            default = statistics.median(costs.values()) if costs else 1.0
+        return {
+            test_class: costs.get(test_class, default) for test_class in test_classes
+        }
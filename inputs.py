@@ -0,0 +1,145 @@
+"""
+OS level keyboard and mouse input. It's needed for the menus, since they seem
+to be system level, which can't be handled by selenium.
+
+The backends are only loaded at first use, because they need the DISPLAY
+variable. It is set when starting xvfb.
+"""
+
+import logging
+import os
+import time
+from typing import Sequence, Union
+
+# "pyautogui": Send each key by pyautogui.
+# "xtest": Send the keys of a call in one batch by the XTest extension. It isn't
+# verified under xvfb yet, so it has to be chosen explicitly.
+BACKEND = os.getenv("TEST_INPUT_BACKEND", "pyautogui")
+# Delay between the keys of a batch in seconds.
+KEY_DELAY = float(os.getenv("TEST_KEY_DELAY", "0"))
+# Delay after each call in seconds. Gives the app time to react, like pyautogui.
+PAUSE = float(os.getenv("TEST_INPUT_PAUSE", "0.1"))
+
+# pyautogui key names to X keysym names.
+KEYSYM_NAMES = {
+    "alt": "Alt_L",
+    "backspace": "BackSpace",
+    "ctrl": "Control_L",
+    "delete": "Delete",
+    "down": "Down",
+    "enter": "Return",
+    "esc": "Escape",
+    "left": "Left",
+    "right": "Right",
+    "shift": "Shift_L",
+    "space": "space",
+    "tab": "Tab",
+    "up": "Up",
+    **{f"f{number}": f"F{number}" for number in range(1, 13)},
+}
+
+
+class PyAutoGuiBackend:
+    """One X11 request and one pause per key."""
+
+    def __init__(self):
+        import pyautogui  # pylint: disable=import-outside-toplevel
+
+        self.pyautogui = pyautogui
+
+    def press(self, keys: Sequence[str], delay: float):
+        self.pyautogui.press(list(keys), interval=delay, _pause=False)
+
+    def hotkey(self, keys: Sequence[str]):
+        self.pyautogui.hotkey(*keys, _pause=False)
+
+    def click(self):
+        self.pyautogui.click(_pause=False)
+
+
+class XTestBackend:
+    """Queue the events of a call and send them at once."""
+
+    def __init__(self):
+        # pylint: disable=import-outside-toplevel
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+
+        self.X = X  # pylint: disable=invalid-name
+        self.XK = XK  # pylint: disable=invalid-name
+        self.xtest = xtest
+        self.display = display.Display()
+        self.keycodes = {}
+
+    def keycode(self, key: str) -> int:
+        if key not in self.keycodes:
+            if key in KEYSYM_NAMES:
+                keysym = self.XK.string_to_keysym(KEYSYM_NAMES[key])
+            else:
+                # The keysyms of latin-1 characters are their code points.
+                keysym = ord(key)
+            keycode = self.display.keysym_to_keycode(keysym)
+            if keycode == 0:
+                raise ValueError(f"Key {key} isn't mapped.")
+            self.keycodes[key] = keycode
+        return self.keycodes[key]
+
+    def send(self, event_type: int, detail: int):
+        self.xtest.fake_input(self.display, event_type, detail)
+
+    def press(self, keys: Sequence[str], delay: float):
+        for key in keys:
+            self.send(self.X.KeyPress, self.keycode(key))
+            self.send(self.X.KeyRelease, self.keycode(key))
+            if delay:
+                self.display.sync()
+                time.sleep(delay)
+        self.display.sync()
+
+    def hotkey(self, keys: Sequence[str]):
+        for key in keys:
+            self.send(self.X.KeyPress, self.keycode(key))
+        for key in reversed(keys):
+            self.send(self.X.KeyRelease, self.keycode(key))
+        self.display.sync()
+
+    def click(self):
+        self.send(self.X.ButtonPress, 1)
+        self.send(self.X.ButtonRelease, 1)
+        self.display.sync()
+
+
+BACKENDS = {"pyautogui": PyAutoGuiBackend, "xtest": XTestBackend}
+_backend = None
+
+
+def get_backend():
+    global _backend  # pylint: disable=global-statement
+
+    if _backend is None:
+        logging.debug(f"Input: use {BACKEND} backend")
+        _backend = BACKENDS[BACKEND]()
+    return _backend
+
+
+def press(
+    keys: Union[str, Sequence[str]], delay: float = KEY_DELAY, pause: bool = True
+):
+    """Press one key or a sequence of keys, like "pyautogui.press()"."""
+    get_backend().press([keys] if isinstance(keys, str) else keys, delay)
+    if pause:
+        time.sleep(PAUSE)
+
+
+def hotkey(*keys: str, pause: bool = True):
+    """Press the keys together, for example hotkey("ctrl", "shift", "s")."""
+    get_backend().hotkey(keys)
+    if pause:
+        time.sleep(PAUSE)
+
+
+def click(pause: bool = True):
+    """Click at the current position of the mouse."""
+    get_backend().click()
+    if pause:
+        time.sleep(PAUSE)
@@ -0,0 +1,156 @@
+"""
+Measure the latency of interactions inside the renderer. The time goes from the
+click event until the first frame, that shows the expected state.
+"""
+
+# Start at the click on the target and check the condition of the interaction
+# each frame. The frame is painted after the callback, so the end is marked in
+# the next frame.
+ARM_SCRIPT = """
+const [interaction, target, expected, timeout] = arguments;
+
+function noteItems() {
+  return [...document.querySelectorAll(".rli-noteList a[data-id]")];
+}
+
+function itemTitle(item) {
+  return item.textContent.trim();
+}
+
+function editorText() {
+  const editor = document.querySelector(".rli-editor .CodeMirror");
+  if (editor === null) {
+    return null;
+  }
+  return editor.CodeMirror ? editor.CodeMirror.getValue() : editor.textContent;
+}
+
+function viewerText() {
+  const viewer = document.querySelector(".rli-editor iframe.noteTextViewer");
+  try {
+    return viewer.contentDocument.body.textContent;
+  } catch (error) {
+    // The viewer can't be checked, if it isn't accessible.
+    return null;
+  }
+}
+
+const perf = {
+  start: null,
+  end: null,
+  error: null,
+  done: null,
+  before: new Set(noteItems().map((item) => item.dataset.id)),
+  clicked: null,
+};
+
+const conditions = {
+  // The rendered notes belong to the notebook. Expected are the title prefixes
+  // of the notes by notebook ID. Notes without known prefix are ignored.
+  notebook: () => {
+    const prefix = expected[perf.clicked.dataset.folderId];
+    const prefixes = Object.values(expected);
+    const titles = noteItems().map(itemTitle);
+    return (
+      titles.some((title) => title.startsWith(prefix)) &&
+      titles.every(
+        (title) =>
+          title.startsWith(prefix) || !prefixes.some((other) => title.startsWith(other))
+      )
+    );
+  },
+  // Title, editor and viewer show the clicked note.
+  note: () => {
+    const title = itemTitle(perf.clicked);
+    const body = `${expected} ${title}`;
+    const titleInput = document.querySelector(".rli-editor .title-input");
+    const text = editorText();
+    if (titleInput === null || titleInput.value !== title || text === null) {
+      return false;
+    }
+    const viewer = viewerText();
+    return text.includes(body) && (viewer === null || viewer.includes(body));
+  },
+  // A note of another notebook is rendered.
+  allNotes: () => noteItems().some((item) => !itemTitle(item).startsWith(expected)),
+  // A new note is rendered and the empty title can be edited.
+  newNote: () => {
+    const titleInput = document.querySelector(".rli-editor .title-input");
+    return (
+      noteItems().some((item) => !perf.before.has(item.dataset.id)) &&
+      titleInput !== null && titleInput.value === ""
+    );
+  },
+};
+
+function finish(error) {
+  perf.end = performance.now();
+  perf.error = error;
+  if (error === null) {
+    performance.mark(`${interaction}-end`, { startTime: perf.end });
+    performance.measure(interaction, `${interaction}-start`, `${interaction}-end`);
+  }
+  if (perf.done !== null) {
+    perf.done(perf);
+  }
+}
+
+function check() {
+  if (conditions[interaction]()) {
+    requestAnimationFrame(() => finish(null));
+  } else if (performance.now() - perf.start > timeout * 1000) {
+    finish(`${interaction} not rendered after ${timeout} s`);
+  } else {
+    requestAnimationFrame(check);
+  }
+}
+
+function onClick(event) {
+  const clicked = event.target.closest(target);
+  if (clicked === null) {
+    return;
+  }
+  document.removeEventListener("click", onClick, true);
+  perf.clicked = clicked;
+  // The time stamp of the event has the same origin as "performance.now()".
+  perf.start = event.timeStamp;
+  performance.mark(`${interaction}-start`, { startTime: perf.start });
+  requestAnimationFrame(check);
+}
+
+document.addEventListener("click", onClick, true);
+window.__latency = perf;
+"""
+
+COLLECT_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const perf = window.__latency;
+function report() {
+  done({ duration: perf.end - perf.start, error: perf.error });
+}
+if (perf.end !== null) {
+  report();
+} else {
+  perf.done = report;
+}
+"""
+
+
+class LatencyError(Exception):
+    pass
+
+
+def arm(driver, interaction: str, target: str, expected, timeout: float = 20):
+    """
+    Prepare the measurement before clicking. The target is a CSS selector of
+    the element to click.
+    """
+    driver.execute_script(ARM_SCRIPT, interaction, target, expected, timeout)
+
+
+def collect(driver) -> float:
+    """Wait until the interaction is rendered and return its latency in ms."""
+    result = driver.execute_async_script(COLLECT_SCRIPT)
+    if result["error"] is not None:
+        raise LatencyError(result["error"])
+    return result["duration"]
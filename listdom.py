@@ -0,0 +1,118 @@
+"""
+State of the rendered note list, notebooks and tags. It is collected by a single
+script, instead of one request per element and attribute.
+"""
+
+import dataclasses
+from typing import List, Optional
+
+from cdp import Selector
+
+LIST_STATE_SCRIPT = """
+const [sidebar, notelist] = arguments;
+const isVisible = (element) => element.getClientRects().length > 0;
+const isSelected = (element) =>
+  [element, ...element.querySelectorAll("*")].some((e) =>
+    e.classList.contains("selected")
+  );
+const textOf = (element, selector) => {
+  const title = element.querySelector(selector);
+  return (title === null ? element.textContent : title.textContent).trim();
+};
+
+const notes = [...notelist.querySelectorAll("div[class*='-list-item']")].map(
+  (item) => {
+    const link = item.querySelector("a[data-id]");
+    const checkbox = item.querySelector("input[type='checkbox']");
+    return {
+      id: link === null ? null : link.dataset.id,
+      title: link === null ? "" : link.textContent.trim(),
+      selected: item.className.includes("selected"),
+      visible: isVisible(item),
+      is_todo: checkbox !== null,
+      todo_completed: checkbox !== null && checkbox.checked,
+    };
+  }
+);
+
+// The first container is the "All notes" button.
+const notebooks = [...sidebar.querySelectorAll(".list-item-container")]
+  .slice(1)
+  .map((item) => {
+    const folder = item.dataset.folderId === undefined
+      ? item.querySelector("[data-folder-id]")
+      : item;
+    const label = item.querySelector(".note-count-label");
+    return {
+      id: folder === null ? null : folder.dataset.folderId,
+      title: textOf(folder || item, ".title"),
+      selected: isSelected(item),
+      visible: isVisible(item),
+      note_count:
+        label === null || !isVisible(label) ? null : parseInt(label.textContent),
+    };
+  })
+  .filter((notebook) => notebook.id !== null);
+
+const tags = [...sidebar.querySelectorAll("[data-tag-id]")].map((item) => ({
+  id: item.dataset.tagId,
+  title: textOf(item, ".title"),
+  selected: isSelected(item),
+  visible: isVisible(item),
+}));
+
+return { notes, notebooks, tags };
+"""
+
+
+@dataclasses.dataclass
+class NoteItem:
+    """Represents a note or todo of the note list."""
+
+    id: Optional[str]
+    title: str
+    selected: bool
+    visible: bool
+    is_todo: bool
+    todo_completed: bool
+
+
+@dataclasses.dataclass
+class NotebookItem:
+    """Represents a notebook of the sidebar."""
+
+    id: str
+    title: str
+    selected: bool
+    visible: bool
+    # None if there is no visible label, i. e. the notebook is empty.
+    note_count: Optional[int]
+
+
+@dataclasses.dataclass
+class TagItem:
+    """Represents a tag of the sidebar."""
+
+    id: str
+    title: str
+    selected: bool
+    visible: bool
+
+
+@dataclasses.dataclass
+class ListState:
+    notes: List[NoteItem]
+    notebooks: List[NotebookItem]
+    tags: List[TagItem]
+
+
+def read(execute_script) -> ListState:
+    """Collect the state of all list items in one round trip."""
+    result = execute_script(
+        LIST_STATE_SCRIPT, Selector(".rli-sideBar"), Selector(".rli-noteList")
+    )
+    return ListState(
+        notes=[NoteItem(**note) for note in result["notes"]],
+        notebooks=[NotebookItem(**notebook) for notebook in result["notebooks"]],
+        tags=[TagItem(**tag) for tag in result["tags"]],
+    )
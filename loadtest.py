@@ -0,0 +1,362 @@
+"""
+Generate load on the data API of joplin. By default, joplin is started with a
+fresh profile, like for the tests. Use "--url" and "--token" to load a running
+server instead.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import json
+import logging
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from xvfbwrapper import Xvfb
+
+import seeding
+import stats
+
+# Operations and the endpoint they are reported as.
+ENDPOINTS = {
+    "add_note": "POST /notes",
+    "update_note": "PUT /notes/:id",
+    "get_note": "GET /notes/:id",
+    "list_notes": "GET /notes",
+    "get_all_notes": "GET /notes (all pages)",
+    "search": "GET /search",
+    "tag_note": "POST /tags/:id/notes",
+}
+# Relative weights of the operations.
+DEFAULT_MIX = {
+    "add_note": 2,
+    "update_note": 2,
+    "get_note": 5,
+    "list_notes": 2,
+    "get_all_notes": 1,
+    "search": 2,
+    "tag_note": 1,
+}
+# Operations on the seeded items.
+NEEDS_NOTES = {"update_note", "get_note", "search", "tag_note"}
+NEEDS_TAGS = {"tag_note"}
+
+
+class LoadClient:
+    """
+    Operations on a pool of seeded notes and tags. Each operation returns the
+    amount of requests.
+    """
+
+    def __init__(self, url: str, token: str, concurrency: int, seed: int = 0):
+        self.url = url
+        self.token = token
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.notebook_id = ""
+        self.note_ids: List[str] = []
+        self.tag_ids: List[str] = []
+
+        # No retries, since the errors should be counted.
+        self.session = requests.Session()
+        self.session.mount(
+            "http://", HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        )
+
+    def request(self, method: str, path: str, query=None, data=None) -> dict:
+        response = self.session.request(
+            method,
+            f"{self.url}{path}",
+            params={"token": self.token, **(query or {})},
+            json=data,
+            timeout=30,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def setup(self, notes: int, tags: int):
+        """Seed the notes and tags to work on."""
+        result = seeding.Seeder(self.url, self.token).seed(
+            seeding.FixtureSpec(
+                notebooks=[
+                    seeding.NotebookSpec(
+                        "load test",
+                        notes=[
+                            seeding.NoteSpec(f"load note {i}", body="content")
+                            for i in range(notes)
+                        ],
+                    )
+                ],
+                tags=[f"load tag {i}" for i in range(tags)],
+            )
+        )
+        self.notebook_id = result.notebooks["load test"]
+        self.note_ids = result.notes
+        self.tag_ids = list(result.tags.values())
+        logging.debug(f"Load: seeded {notes} notes and {tags} tags")
+
+    def random_note(self) -> str:
+        with self.lock:
+            return self.random.choice(self.note_ids)
+
+    def add_note(self) -> int:
+        note = self.request(
+            "post",
+            "/notes",
+            data={"title": "load note", "body": "new", "parent_id": self.notebook_id},
+        )
+        with self.lock:
+            self.note_ids.append(note["id"])
+        return 1
+
+    def update_note(self) -> int:
+        self.request("put", f"/notes/{self.random_note()}", data={"body": "updated"})
+        return 1
+
+    def get_note(self) -> int:
+        self.request(
+            "get", f"/notes/{self.random_note()}", query={"fields": "id,title,body"}
+        )
+        return 1
+
+    def list_notes(self) -> int:
+        self.request("get", "/notes", query={"limit": 100})
+        return 1
+
+    def get_all_notes(self) -> int:
+        """Fetch all pages, like "get_all_notes()" of joppy."""
+        page = 1
+        while self.request(
+            "get",
+            "/notes",
+            query={"fields": "id,parent_id", "limit": 100, "page": page},
+        )["has_more"]:
+            page += 1
+        return page
+
+    def search(self) -> int:
+        with self.lock:
+            number = self.random.randrange(len(self.note_ids))
+        self.request("get", "/search", query={"query": f"{number}", "type": "note"})
+        return 1
+
+    def tag_note(self) -> int:
+        with self.lock:
+            tag_id = self.random.choice(self.tag_ids)
+        self.request("post", f"/tags/{tag_id}/notes", data={"id": self.random_note()})
+        return 1
+
+
+class Stats:
+    """Latencies and errors per endpoint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = collections.defaultdict(list)
+        self.errors: Dict[str, int] = collections.Counter()
+        self.requests: Dict[str, int] = collections.Counter()
+
+    def record(self, endpoint: str, latency: float, requests_: int, error: bool):
+        with self.lock:
+            self.latencies[endpoint].append(latency)
+            self.requests[endpoint] += requests_
+            if error:
+                self.errors[endpoint] += 1
+
+    def summary(self, duration: float) -> Dict[str, dict]:
+        result = {}
+        with self.lock:
+            for endpoint, latencies in sorted(self.latencies.items()):
+                result[endpoint] = {
+                    "operations": len(latencies),
+                    "requests": self.requests[endpoint],
+                    "errors": self.errors[endpoint],
+                    "error_rate": self.errors[endpoint] / len(latencies),
+                    "throughput": len(latencies) / duration,
+                    **stats.percentiles(latencies, fractions=(0.5, 0.9, 0.99)),
+                }
+        return result
+
+
+def parse_mix(text: Optional[str]) -> Dict[str, float]:
+    """Parse a mix like "get_note=5,add_note=1"."""
+    if text is None:
+        return DEFAULT_MIX
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown operation {name}.")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def check_mix(mix: Dict[str, float], notes: int, tags: int):
+    """Check that the seeded items are enough for the operations of the mix."""
+    if notes == 0 and NEEDS_NOTES.intersection(mix):
+        raise ValueError(
+            f"Operations without seeded notes: {sorted(NEEDS_NOTES.intersection(mix))}"
+        )
+    if tags == 0 and NEEDS_TAGS.intersection(mix):
+        raise ValueError(
+            f"Operations without seeded tags: {sorted(NEEDS_TAGS.intersection(mix))}"
+        )
+
+
+class LoadGenerator:
+    """
+    Run the operations of the mix at a target concurrency (closed loop) or at
+    a target rate (open loop). In the open loop, the latency is measured from
+    the scheduled start, so that a slow server can't hide its queueing.
+    """
+
+    def __init__(
+        self,
+        client: LoadClient,
+        mix: Dict[str, float],
+        concurrency: int,
+        rate: Optional[float] = None,
+    ):
+        check_mix(mix, len(client.note_ids), len(client.tag_ids))
+        self.client = client
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.concurrency = concurrency
+        self.rate = rate
+        self.random = random.Random(client.random.random())
+        self.stats = Stats()
+
+    def choose(self) -> str:
+        with self.client.lock:
+            return self.random.choices(self.operations, self.weights)[0]
+
+    def run_operation(self, operation: str, scheduled: float):
+        requests_, error = 1, False
+        try:
+            requests_ = getattr(self.client, operation)()
+        except Exception as exception:  # pylint: disable=broad-except
+            # Any failure counts as error. It shouldn't end the worker.
+            logging.debug(f"Load: {operation} failed: {exception}")
+            error = True
+        self.stats.record(
+            ENDPOINTS[operation], time.perf_counter() - scheduled, requests_, error
+        )
+
+    def closed_loop(self, end: float):
+        while time.perf_counter() < end:
+            self.run_operation(self.choose(), time.perf_counter())
+
+    def run(self, duration: float) -> float:
+        """Generate load for the duration. Return the actual duration."""
+        start = time.perf_counter()
+        end = start + duration
+        futures = []
+        with concurrent.futures.ThreadPoolExecutor(self.concurrency) as executor:
+            if self.rate is None:
+                for _ in range(self.concurrency):
+                    futures.append(executor.submit(self.closed_loop, end))
+            else:
+                interval = 1 / self.rate
+                scheduled = start
+                while scheduled < end:
+                    time.sleep(max(0.0, scheduled - time.perf_counter()))
+                    futures.append(
+                        executor.submit(self.run_operation, self.choose(), scheduled)
+                    )
+                    scheduled += interval
+        # Don't let a broken worker go unnoticed.
+        for future in futures:
+            future.result()
+        return time.perf_counter() - start
+
+
+def print_summary(summary: Dict[str, dict], duration: float):
+    print(
+        f"{'endpoint':24} | {'ops':>6} | {'ops/s':>7} | {'errors':>6} | "
+        f"{'p50 [ms]':>8} | {'p90 [ms]':>8} | {'p99 [ms]':>8} | {'max [ms]':>8}"
+    )
+    for endpoint, row in summary.items():
+        print(
+            f"{endpoint:24} | {row['operations']:6} | {row['throughput']:7.1f} | "
+            f"{row['error_rate']:6.1%} | {row['p50'] * 1000:8.1f} | "
+            f"{row['p90'] * 1000:8.1f} | {row['p99'] * 1000:8.1f} | "
+            f"{row['max'] * 1000:8.1f}"
+        )
+    operations = sum(row["operations"] for row in summary.values())
+    print(f"Total: {operations} operations in {duration:.1f} s")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", type=str, help="URL of a running data API.")
+    parser.add_argument("--token", type=str, help="Token of a running data API.")
+    parser.add_argument(
+        "--mix",
+        type=str,
+        help="Weights of the operations, like 'get_note=5,add_note=1'. "
+        f"Available: {', '.join(DEFAULT_MIX)}",
+    )
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="Target operations per second. By default, each worker starts the "
+        "next operation as soon as the previous finished.",
+    )
+    parser.add_argument("--duration", type=float, default=30, help="In seconds.")
+    parser.add_argument("--notes", type=int, default=500, help="Notes to seed.")
+    parser.add_argument("--tags", type=int, default=20, help="Tags to seed.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, help="Write the summary as JSON.")
+    parser.add_argument(
+        "--no-xvfb", action="store_true", help="Don't start joplin inside xvfb."
+    )
+    args = parser.parse_args()
+    if (args.url is None) != (args.token is None):
+        parser.error("--url and --token have to be given together.")
+    try:
+        args.mix = parse_mix(args.mix)
+        check_mix(args.mix, args.notes, args.tags)
+    except ValueError as error:
+        parser.error(str(error))
+    return args
+
+
+def run(args, url: str, token: str):
+    client = LoadClient(url, token, args.concurrency, seed=args.seed)
+    client.setup(args.notes, args.tags)
+    generator = LoadGenerator(client, args.mix, args.concurrency, rate=args.rate)
+    duration = generator.run(args.duration)
+    summary = generator.stats.summary(duration)
+    print_summary(summary, duration)
+    if args.output is not None:
+        with open(args.output, "w") as outfile:
+            json.dump(summary, outfile, indent=2)
+
+
+def main():
+    args = parse_arguments()
+    if args.url is not None:
+        run(args, args.url, args.token)
+        return
+
+    with contextlib.nullcontext() if args.no_xvfb else Xvfb(width=1920, height=1080):
+        # Start joplin and activate the data API, like for the tests.
+        # pylint: disable=import-outside-toplevel
+        from api import api
+        import driver
+
+        try:
+            run(args, api.url, api.token)
+        finally:
+            driver.driver.quit()
+            driver.chromedriver_service.stop()
+
+
+if __name__ == "__main__":
+    main()
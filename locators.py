@@ -0,0 +1,124 @@
+"""
+Cache of located elements. Locating by XPath searches the full document,
+which is slow. Stale elements are located again transparently.
+"""
+
+import functools
+import logging
+from typing import Dict, Optional, Tuple
+
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.remote.webelement import WebElement
+
+import wait
+
+# (by, locator, key of the scope or None for the full document)
+Key = Tuple[str, str, Optional[tuple]]
+
+
+def retry_if_stale(func):
+    """Locate the element again, if it got stale, and run the method once more."""
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        except StaleElementReferenceException as error:
+            try:
+                self.relocate()
+            except (NoSuchElementException, TimeoutException):
+                # The element is gone for real. Don't hide it behind the timeout.
+                raise error from None
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+class CachedElement(WebElement):
+    """Element that locates itself again when it got stale or invalidated."""
+
+    def __init__(self, cache: "LocatorCache", key: Key, element: WebElement):
+        super().__init__(element.parent, element.id)
+        self.cache = cache
+        self.key = key
+        self.generation = cache.generation
+
+    def relocate(self):
+        self.cache.stale += 1
+        self._id = self.cache.resolve(self.key).id
+        self.generation = self.cache.generation
+        self.cache.elements.setdefault(self.key, self)
+
+    @property
+    def id(self) -> str:
+        # Used when the element is passed to scripts and actions.
+        if self.generation != self.cache.generation:
+            self.relocate()
+        return self._id
+
+    @retry_if_stale
+    def _execute(self, command, params=None):
+        if self.generation != self.cache.generation:
+            self.relocate()
+        return super()._execute(command, params)
+
+    # These methods execute a script instead of a command.
+    get_attribute = retry_if_stale(WebElement.get_attribute)
+    is_displayed = retry_if_stale(WebElement.is_displayed)
+
+
+class LocatorCache:
+    """Cache located elements by locator and scope."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.elements: Dict[Key, CachedElement] = {}
+        # Invalidated elements are located again at their next usage.
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def resolve(self, key: Key, timeout: float = 1) -> WebElement:
+        by_, locator, scope_key = key
+        if scope_key is None:
+            return wait.wait_for_element(
+                self.driver, by_, locator, condition="present", timeout=timeout
+            )
+        return self.get(scope_key).find_element(by_, locator)
+
+    def get(self, key: Key, timeout: float = 1) -> CachedElement:
+        element = self.elements.get(key)
+        if element is None:
+            self.misses += 1
+            element = CachedElement(self, key, self.resolve(key, timeout=timeout))
+            self.elements[key] = element
+        else:
+            self.hits += 1
+        return element
+
+    def find(
+        self,
+        by_: str,
+        locator: str,
+        scope: Optional[CachedElement] = None,
+        timeout: float = 1,
+    ) -> CachedElement:
+        """
+        Find an element and wait until it's present. The scope has to be a cached
+        element, too.
+        """
+        return self.get((by_, locator, None if scope is None else scope.key), timeout)
+
+    def invalidate(self):
+        """Drop all elements, for example after the layout or the data changed."""
+        logging.debug(
+            f"Locator cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.stale} stale"
+        )
+        self.elements.clear()
+        self.generation += 1
@@ -1,10 +1,16 @@
 """Helper functions for accessing menus of the joplin app."""
 
 import dataclasses
+import functools
 import logging
-from typing import Dict, List, Optional, Sequence
+import time
+from typing import Sequence, Tuple
 
-import pyautogui
+import inputs
+
+
+# Opening a menu takes some time. The other keys can be sent at once.
+MENU_DELAY = 0.1
 
 
 @dataclasses.dataclass
@@ -13,6 +19,8 @@ class Entry:
 
     name: str
     subentries: Sequence = ()
+    # Disabled entries are skipped by the keyboard navigation.
+    disabled: bool = False
 
 
 NOTEBOOK_MENU_LAYOUT = (
@@ -129,7 +137,8 @@ TOP_MENU_LAYOUT = (
         "Go",
         (
             Entry("Back"),
-            Entry("Forward"),
+            # Only selectable after going back.
+            Entry("Forward", disabled=True),
             Entry(
                 "Focus",
                 (
@@ -184,32 +193,52 @@ TOP_MENU_LAYOUT = (
 
 def choose_entry(position: int, key: str = "down", confirm: str = "enter"):
     """Select an entry from an arbitrary menu. The position has to be one based!"""
-    pyautogui.press(key, presses=position)
-    pyautogui.press(confirm)
+    inputs.press([key] * position + [confirm])
+
+
+def find_entry(entries: Sequence[Entry], name: str) -> Tuple[int, Entry]:
+    """
+    Find an entry and count the key presses to reach it. Disabled entries are
+    skipped, except the target entry itself.
+    """
+    presses = 0
+    for entry in entries:
+        if entry.name == name:
+            return presses, entry
+        if not entry.disabled:
+            presses += 1
+    raise ValueError(f"Menu entry {name} doesn't exist.")
+
+
+@functools.lru_cache(maxsize=None)
+def compile_path(path: Tuple[str, ...]) -> Tuple[Tuple[str, ...], ...]:
+    """
+    Convert a path of the top menu to groups of keys. A group ends when a menu
+    gets opened.
+    """
+    # focus the menu
+    groups = [("alt",)]
+
+    # find toplevel entry and open it
+    presses, last_entry = find_entry(TOP_MENU_LAYOUT, path[0])
+    # select the first entry, since the presses are zero based
+    groups.append(("right",) * presses + ("enter",))
+    next_group: Tuple[str, ...] = ("down",)
+
+    for name in path[1:]:
+        # find next entry and select it
+        presses, last_entry = find_entry(last_entry.subentries, name)
+        groups.append(next_group + ("down",) * presses + ("enter",))
+        next_group = ()
+    return tuple(groups)
 
 
-def top(path: List[str], skip: Optional[Dict[str, int]] = None):
+def top(path: Sequence[str]):
     """Select an entry from the top menu."""
-    # TODO: path gets modified, which can cause side effects
-
-    # skip non selectable entries
-    if skip is None:
-        skip = {}
-
     logging.debug(f"Selecting {path} from top menu.")
-
-    pyautogui.press("alt")  # focus the menu
-
-    # find toplevel entry and select it
-    toplevel_entry = path.pop(0)
-    match_index = [e.name for e in TOP_MENU_LAYOUT].index(toplevel_entry)
-    choose_entry(match_index, key="right")
-    pyautogui.press("down")  # select the first entry, since match_index is zero based
-    last_entry = TOP_MENU_LAYOUT[match_index]
-
-    while path:
-        # find next entry and select it
-        next_entry = path.pop(0)
-        match_index = [e.name for e in last_entry.subentries].index(next_entry)
-        choose_entry(match_index - skip.get(next_entry, 0))
-        last_entry = last_entry.subentries[match_index]
+    groups = compile_path(tuple(path))
+    for index, keys in enumerate(groups):
+        if index > 0:
+            time.sleep(MENU_DELAY)
+        # Only pause after the last key, to give the app time to react.
+        inputs.press(keys, pause=index == len(groups) - 1)
@@ -0,0 +1,116 @@
+"""
+Local mirror of the joplin data. It avoids fetching the complete lists
+through the API for each count or random selection.
+"""
+
+import logging
+import random
+from typing import Dict, List, Optional, Tuple
+
+# See: https://joplinapp.org/api/references/rest_api/#item-type-ids
+ITEM_TYPE_NOTE = 1
+
+# See: https://joplinapp.org/api/references/rest_api/#events
+EVENT_CREATED = 1
+EVENT_UPDATED = 2
+EVENT_DELETED = 3
+
+
+class StateMirror:
+    """
+    Notes are followed incrementally by the "/events" change cursor.
+    Joplin only tracks changes of notes. Notebooks and tags are usually only a few,
+    so they are fetched completely, but with minimal fields.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        self.cursor: Optional[int] = None
+        # Map of ID to parent ID. The parent of a changed note is fetched lazily.
+        self.notes: Dict[str, Optional[str]] = {}
+        self.notebooks: Dict[str, str] = {}
+        self.tags: List[str] = []
+
+    def _get_events(self, **query) -> dict:
+        return self.api.get("/events", query=query).json()
+
+    def sync_notes(self):
+        """Apply all note changes since the last sync. Initialize at first sync."""
+        if self.cursor is None:
+            # Get the cursor first. Changes in between are simply applied twice.
+            self.cursor = self._get_events()["cursor"]
+            self.notes = {
+                note.id: note.parent_id
+                for note in self.api.get_all_notes(fields="id,parent_id")
+            }
+            logging.debug(f"Mirror: initialized with {len(self.notes)} notes")
+            return
+
+        while True:
+            response = self._get_events(cursor=self.cursor)
+            for event in response["items"]:
+                if event["item_type"] != ITEM_TYPE_NOTE:
+                    continue
+                if event["type"] == EVENT_DELETED:
+                    self.notes.pop(event["item_id"], None)
+                else:
+                    # The note could have been moved to another notebook.
+                    self.notes[event["item_id"]] = None
+            self.cursor = response["cursor"]
+            if not response["has_more"]:
+                break
+
+    def sync_notebooks(self):
+        self.notebooks = {
+            notebook.id: notebook.parent_id
+            for notebook in self.api.get_all_notebooks(fields="id,parent_id")
+        }
+
+    def sync_tags(self):
+        self.tags = [tag.id for tag in self.api.get_all_tags(fields="id")]
+
+    def note_count(self) -> int:
+        self.sync_notes()
+        return len(self.notes)
+
+    def notebook_count(self) -> int:
+        self.sync_notebooks()
+        return len(self.notebooks)
+
+    def tag_count(self) -> int:
+        self.sync_tags()
+        return len(self.tags)
+
+    def has_note(self, id_: str) -> bool:
+        self.sync_notes()
+        return id_ in self.notes
+
+    def parent_of(self, note_id: str) -> str:
+        parent_id = self.notes.get(note_id)
+        if parent_id is None:
+            parent_id = self.api.get_note(id_=note_id, fields="parent_id").parent_id
+            self.notes[note_id] = parent_id
+        return parent_id
+
+    def random_note(self, exclude: Optional[List[str]] = None) -> Tuple[str, str]:
+        """Return the ID and the parent ID of a random note."""
+        self.sync_notes()
+        exclude = exclude or []
+        candidates = [note_id for note_id in self.notes if note_id not in exclude]
+        note_id = random.choice(candidates)
+        return note_id, self.parent_of(note_id)
+
+    def random_notebook(self, exclude: Optional[List[str]] = None) -> str:
+        self.sync_notebooks()
+        exclude = exclude or []
+        # TODO: Could be problematic for multiple time nested notebook.
+        candidates = [
+            notebook_id
+            for notebook_id, parent_id in self.notebooks.items()
+            if notebook_id not in exclude and parent_id not in exclude
+        ]
+        return random.choice(candidates)
+
+    def random_tag(self) -> str:
+        self.sync_tags()
+        return random.choice(self.tags)
@@ -0,0 +1,114 @@
+"""
+Profile where the time of a test goes. The events can be viewed by the chrome
+trace viewer ("chrome://tracing") or https://ui.perfetto.dev. Nothing is
+instrumented, if profiling is disabled.
+"""
+
+import collections
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import stats
+
+
+def enabled() -> bool:
+    """Read at call time, since the runner sets the variable after the import."""
+    return os.getenv("TEST_PROFILE") == "1"
+
+
+class Profiler:
+    """Collect trace events per test and durations over all tests."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events: List[dict] = []
+        self.durations: Dict[str, List[float]] = collections.defaultdict(list)
+        self.pid = os.getpid()
+
+    def record(self, category: str, name: str, start: float, duration: float):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",  # complete event
+            "ts": start * 1e6,
+            "dur": duration * 1e6,
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+        }
+        with self.lock:
+            self.events.append(event)
+            self.durations[f"{category}: {name}"].append(duration)
+
+    def write_trace(self, path: str):
+        """Write the events since the last call in the trace event format."""
+        with self.lock:
+            events, self.events = self.events, []
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as outfile:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, outfile)
+
+    def hotspots(self) -> str:
+        """Table of all primitives, sorted by their total duration."""
+        rows = []
+        with self.lock:
+            for name, durations in self.durations.items():
+                ordered = sorted(durations)
+                p95 = stats.percentile(ordered, 0.95)
+                rows.append((sum(ordered), len(ordered), p95, name))
+        lines = [f"{'total [s]':>9} | {'calls':>6} | {'p95 [ms]':>8} | primitive"]
+        for total, calls, p95, name in sorted(rows, reverse=True):
+            lines.append(f"{total:9.3f} | {calls:6} | {p95 * 1000:8.1f} | {name}")
+        return "\n".join(lines)
+
+
+profiler = Profiler()
+
+
+def timed(category: str, func: Callable, name: Optional[Callable] = None):
+    """Wrap a function. The name of the event can depend on the arguments."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.record(
+                category,
+                func.__name__ if name is None else name(*args, **kwargs),
+                start,
+                time.perf_counter() - start,
+            )
+
+    return wrapper
+
+
+def patch(owner, attribute: str, category: str, name: Optional[Callable] = None):
+    setattr(owner, attribute, timed(category, getattr(owner, attribute), name=name))
+
+
+def patch_all(module, functions, category: str):
+    for function in functions:
+        patch(module, function, category)
+
+
+def instrument(driver, api):
+    """Wrap the webdriver commands and the data API requests."""
+    patch(
+        driver.command_executor,
+        "execute",
+        "webdriver",
+        name=lambda command, params: command,
+    )
+    patch(
+        api,
+        "_request",
+        "api",
+        name=lambda method, path, *_, **__: (
+            f"{method.upper()} /{path.strip('/').split('/')[0]}"
+        ),
+    )
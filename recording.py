@@ -0,0 +1,224 @@
+"""Screen recordings of the test run with ffmpeg."""
+
+import contextlib
+import csv
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from typing import List, Optional, Tuple
+
+# The running recording. Tests report their failures to it.
+active: Optional["SegmentedRecording"] = None
+
+
+def keep_failure(name: str, start: float, end: float):
+    """Keep the recording of a failed test, if only failures are recorded."""
+    if active is not None:
+        active.keep(name, start, end)
+
+
+def check_ffmpeg():
+    subprocess.run(
+        ["ffmpeg", "--help"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+class Recording(contextlib.ContextDecorator):
+    """Record the complete test run with ffmpeg."""
+
+    def __init__(self, path="debug/output.mp4"):
+        super().__init__()
+        self.path = path
+        self.recording_process = None
+
+    def output_arguments(self) -> List[str]:
+        return [self.path]
+
+    def __enter__(self):
+        logging.debug("Start recording")
+
+        # check whether ffmpeg is available
+        check_ffmpeg()
+
+        self.recording_process = subprocess.Popen(
+            # fmt: off
+            [
+                "ffmpeg",
+                "-y",  # overwrite automatically
+                "-video_size", "1920x1080",
+                "-framerate", "20",
+                "-f", "x11grab",
+                "-i", os.getenv("DISPLAY"),
+                *self.output_arguments(),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            # fmt: on
+        )
+        return self
+
+    def __exit__(self, *exc):
+        time.sleep(1)  # give ffmpeg some time to finish
+        self.recording_process.terminate()
+        self.recording_process.wait()
+        return False  # don't suppress exceptions
+
+
+class SegmentedRecording(Recording):
+    """
+    Record short segments into a ring buffer of fixed size. Only the segments
+    around failed tests are kept. They are concatenated without transcoding
+    at the end.
+    """
+
+    def __init__(
+        self,
+        path="debug/failures",
+        segment_time: int = 10,
+        segments: int = 30,
+        margin: float = 2.0,
+    ):
+        # The ring buffer has to cover the longest test, i. e. 5 minutes by default.
+        super().__init__(path=path)
+        self.segment_time = segment_time
+        self.segments = segments
+        self.margin = margin
+        self.ring_dir = f"{path}/ring"
+        self.kept_dir = f"{path}/kept"
+        self.segment_list = f"{self.ring_dir}/segments.csv"
+
+        self.start_time = 0.0
+        self.lock = threading.Lock()
+        self.failures: List[Tuple[str, float, float]] = []  # name, start, end
+        # Completed segments as tuple of sequence number, start, end and filename.
+        self.completed: List[Tuple[int, float, float, str]] = []
+        self.kept = set()  # sequence numbers of the kept segments
+        self.stopped = threading.Event()
+        self.watcher = threading.Thread(target=self.watch, daemon=True)
+
+    def output_arguments(self) -> List[str]:
+        # fmt: off
+        return [
+            # A keyframe at each segment start. Else segments can't be cut exactly.
+            "-force_key_frames", f"expr:gte(t,n_forced*{self.segment_time})",
+            "-f", "segment",
+            "-segment_time", str(self.segment_time),
+            "-segment_wrap", str(self.segments),
+            "-segment_list", self.segment_list,
+            "-segment_list_type", "csv",
+            "-reset_timestamps", "1",
+            f"{self.ring_dir}/segment_%03d.mp4",
+        ]
+        # fmt: on
+
+    def keep(self, name: str, start: float, end: float):
+        """Keep the segments between both points in time (seconds since epoch)."""
+        logging.debug(f"Recording: keep {name}")
+        with self.lock:
+            self.failures.append(
+                (
+                    name,
+                    start - self.start_time - self.margin,
+                    end - self.start_time + self.margin,
+                )
+            )
+
+    def is_needed(self, start: float, end: float) -> bool:
+        return any(
+            start < failure_end and end > failure_start
+            for _, failure_start, failure_end in self.failures
+        )
+
+    def collect(self):
+        """Move the completed segments of failed tests out of the ring buffer."""
+        try:
+            with open(self.segment_list, newline="") as infile:
+                content = infile.read()
+        except FileNotFoundError:
+            return  # no segment completed yet
+        # Skip the last line, if ffmpeg didn't finish writing it.
+        rows = list(csv.reader(content[: content.rfind("\n") + 1].splitlines()))
+        with self.lock:
+            # The list is only appended, so known rows can be skipped.
+            for row in rows[len(self.completed) :]:
+                filename, start, end = row[0], float(row[1]), float(row[2])
+                self.completed.append((len(self.completed), start, end, filename))
+            for sequence, start, end, filename in self.completed:
+                if sequence in self.kept or not self.is_needed(start, end):
+                    continue
+                # Rename, before ffmpeg overwrites the segment in the next cycle.
+                os.replace(
+                    f"{self.ring_dir}/{filename}",
+                    f"{self.kept_dir}/{sequence:06d}.mp4",
+                )
+                self.kept.add(sequence)
+
+    def watch(self):
+        while not self.stopped.wait(self.segment_time / 4):
+            self.collect()
+
+    def concatenate(self):
+        """Join the kept segments of each failure to a single video."""
+        for name, failure_start, failure_end in self.failures:
+            sequences = [
+                sequence
+                for sequence, start, end, _ in self.completed
+                if sequence in self.kept and start < failure_end and end > failure_start
+            ]
+            if not sequences:
+                logging.warning(f"Recording: no segments for {name}")
+                continue
+            concat_list = f"{self.kept_dir}/{name}.txt"
+            with open(concat_list, "w") as outfile:
+                for sequence in sequences:
+                    outfile.write(f"file '{sequence:06d}.mp4'\n")
+            subprocess.run(
+                # fmt: off
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-f", "concat",
+                    "-i", concat_list,
+                    "-c", "copy",  # no transcoding
+                    f"{self.path}/{name}.mp4",
+                ],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                # fmt: on
+            )
+
+    def __enter__(self):
+        global active  # pylint: disable=global-statement
+
+        shutil.rmtree(self.ring_dir, ignore_errors=True)
+        shutil.rmtree(self.kept_dir, ignore_errors=True)
+        os.makedirs(self.ring_dir)
+        os.makedirs(self.kept_dir)
+        self.start_time = time.time()
+        super().__enter__()
+        self.watcher.start()
+        active = self
+        return self
+
+    def __exit__(self, *exc):
+        global active  # pylint: disable=global-statement
+
+        active = None
+        super().__exit__(*exc)
+        self.stopped.set()
+        self.watcher.join()
+        # The last segment is completed when ffmpeg exits.
+        self.collect()
+        self.concatenate()
+
+        # Only the joined videos remain. The disk usage is bounded by the ring.
+        shutil.rmtree(self.ring_dir, ignore_errors=True)
+        shutil.rmtree(self.kept_dir, ignore_errors=True)
+        return False  # don't suppress exceptions
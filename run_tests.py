@@ -1,18 +1,28 @@
 """Custom test runner to provide xvfb and stop the chromedriver."""
 
 import argparse
+import ast
 import contextlib
+import json
 import logging
 import os
 import subprocess
 import sys
-import time
 import typing
 import unittest
 import warnings
 
 from xvfbwrapper import Xvfb
 
+import capture
+from history import DurationHistory
+import profiling
+from recording import Recording, SegmentedRecording
+import scheduler
+
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 @contextlib.contextmanager
 def optional(condition: bool, context_manager: typing.ContextManager):
@@ -27,49 +37,6 @@ def optional(condition: bool, context_manager: typing.ContextManager):
         yield
 
 
-class Recording(contextlib.ContextDecorator):
-    """Record the complete test run with ffmpeg."""
-
-    def __init__(self, path="debug/output.mp4"):
-        super().__init__()
-        self.path = path
-        self.recording_process = None
-
-    def __enter__(self):
-        logging.debug("Start recording")
-
-        # check whether ffmpeg is available
-        subprocess.run(
-            ["ffmpeg", "--help"],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-
-        self.recording_process = subprocess.Popen(
-            # fmt: off
-            [
-                "ffmpeg",
-                "-y",  # overwrite automatically
-                "-video_size", "1920x1080",
-                "-framerate", "20",
-                "-f", "x11grab",
-                "-i", os.getenv("DISPLAY"),
-                self.path,
-            ],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            # fmt: on
-        )
-        return self
-
-    def __exit__(self, *exc):
-        time.sleep(1)  # give ffmpeg some time to finish
-        self.recording_process.terminate()
-        self.recording_process.wait()
-        return False  # don't suppress exceptions
-
-
 def configure_logging(debug_dir: str):
     # Don't spam the log. See: https://stackoverflow.com/a/11029841/7410886
     logging.getLogger("selenium.webdriver.remote.remote_connection").setLevel(
@@ -104,16 +71,274 @@ def parse_arguments():
     parser.add_argument(
         "--verbosity", type=int, default=2, help="Test runner verbosity."
     )
-    parser.add_argument("--testname", help="Run a subset of tests.")
+    parser.add_argument(
+        "--record-failures-only",
+        action="store_true",
+        help="Record into a ring buffer of short segments. Only keep the segments "
+        "around failed tests.",
+    )
+    parser.add_argument(
+        "--screenshot-format",
+        choices=("png", "jpeg", "webp"),
+        default="png",
+        help="Format of the app screenshots at failures.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a trace per test and a table of the slowest test primitives.",
+    )
+    parser.add_argument(
+        "--cdp-backend",
+        action="store_true",
+        help="Connect directly to the renderer for frequent operations.",
+    )
+    parser.add_argument(
+        "--perf-sizes",
+        type=int,
+        nargs="+",
+        default=[],
+        help="Measure the interaction latency with profiles of the given amounts "
+        "of notes, for example 1000 10000 50000.",
+    )
+    parser.add_argument(
+        "--perf-samples",
+        type=int,
+        default=10,
+        help="Measurements per interaction and profile size.",
+    )
+    parser.add_argument(
+        "--perf-notebooks",
+        type=int,
+        default=20,
+        help="Notebooks to distribute the notes of the performance profiles to.",
+    )
+    parser.add_argument(
+        "--perf-scroll-speeds",
+        type=int,
+        nargs="+",
+        default=[1000, 5000],
+        help="Speeds in px/s to scroll the lists of the performance profiles.",
+    )
+    parser.add_argument("--testname", nargs="+", help="Run a subset of tests.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of isolated workers to distribute the test classes to.",
+    )
+    parser.add_argument(
+        "--history",
+        type=str,
+        default=os.path.join(TEST_DIR, "history.sqlite"),
+        help="Database of previous test durations. Used to balance the workers.",
+    )
+    parser.add_argument(
+        "--extract-appimage",
+        action="store_true",
+        help="Start joplin from the extracted AppImage. Speeds up each app start.",
+    )
+    parser.add_argument(
+        "--reset",
+        choices=("api", "snapshot"),
+        default="api",
+        help="Reset the app state after each test class by deleting all notebooks "
+        "via API or by restoring a snapshot of the pristine profile.",
+    )
+    parser.add_argument(
+        "--api-setup",
+        choices=("ui", "settings"),
+        default="ui",
+        help="Activate the data API by the options UI or by the profile settings.",
+    )
+    parser.add_argument(
+        "--input-backend",
+        choices=("pyautogui", "xtest"),
+        default="pyautogui",
+        help="Send OS level keys one by one by pyautogui or batched by XTest.",
+    )
+    parser.add_argument(
+        "--api-port",
+        type=int,
+        default=41184,
+        help="Data API port of the first worker. Following workers count upwards.",
+    )
     args = parser.parse_args()
+    if args.workers > 1 and args.no_xvfb:
+        parser.error("Multiple workers need their own xvfb display.")
     return args
 
 
+def discover_test_classes(start_dir: str = TEST_DIR) -> typing.List[str]:
+    """
+    Find the names of all test classes without importing them,
+    since importing starts the app.
+    """
+    test_classes = []
+    for filename in sorted(os.listdir(start_dir)):
+        if not (filename.startswith("test") and filename.endswith(".py")):
+            continue
+        with open(os.path.join(start_dir, filename)) as infile:
+            tree = ast.parse(infile.read())
+        module_name = filename[: -len(".py")]
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and any(
+                ast.unparse(base) == "base.Test" for base in node.bases
+            ):
+                test_classes.append(f"{module_name}.{node.name}")
+    return test_classes
+
+
+def write_result(result: unittest.TestResult, path: str):
+    """Write a summary of the test result, so that it can be merged later."""
+    summary = {
+        "tests_run": result.testsRun,
+        "failures": [test.id() for test, _ in result.failures],
+        "errors": [test.id() for test, _ in result.errors],
+        "skipped": [test.id() for test, _ in result.skipped],
+        "successful": result.wasSuccessful(),
+    }
+    with open(path, "w") as outfile:
+        json.dump(summary, outfile, indent=4)
+
+
+def run_workers(args):
+    """Distribute the test classes to isolated workers and merge their results."""
+    test_classes = args.testname or discover_test_classes()
+    if "test_performance.Performance" in test_classes:
+        # The classes per profile size are only created at import.
+        test_classes.remove("test_performance.Performance")
+        test_classes.extend(
+            f"test_performance.Performance{size}" for size in args.perf_sizes
+        )
+    history = DurationHistory(args.history)
+    costs = history.class_costs(test_classes)
+    history.close()
+    shards = scheduler.plan_balanced(costs, args.workers)
+    logging.debug(f"Predicted duration: {scheduler.makespan(shards, costs):.1f} s")
+
+    workers = []
+    for index, shard in enumerate(shards):
+        if not shard:
+            continue
+        # Each worker gets its own cwd. It contains the profile and debug output.
+        worker_dir = os.path.abspath(f"{args.debug_dir}/worker_{index}")
+        os.makedirs(worker_dir, exist_ok=True)
+        command = [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--debug-dir",
+            worker_dir,
+            "--verbosity",
+            str(args.verbosity),
+            "--history",
+            os.path.abspath(args.history),
+            "--reset",
+            args.reset,
+            "--api-setup",
+            args.api_setup,
+            "--screenshot-format",
+            args.screenshot_format,
+            "--input-backend",
+            args.input_backend,
+            "--perf-samples",
+            str(args.perf_samples),
+            "--perf-notebooks",
+            str(args.perf_notebooks),
+            "--perf-scroll-speeds",
+            *map(str, args.perf_scroll_speeds),
+            "--testname",
+            *shard,
+        ]
+        if args.perf_sizes:
+            command.extend(["--perf-sizes", *map(str, args.perf_sizes)])
+        if args.no_recording:
+            command.append("--no-recording")
+        if args.record_failures_only:
+            command.append("--record-failures-only")
+        if args.profile:
+            command.append("--profile")
+        if args.cdp_backend:
+            command.append("--cdp-backend")
+        if args.extract_appimage:
+            command.append("--extract-appimage")
+        logging.debug(f"Starting worker {index}: {shard}")
+        with open(f"{worker_dir}/stdout.txt", "w") as outfile:
+            process = subprocess.Popen(  # pylint: disable=consider-using-with
+                command,
+                cwd=worker_dir,
+                env={**os.environ, "JOPLIN_API_PORT": str(args.api_port + index)},
+                stdout=outfile,
+                stderr=subprocess.STDOUT,
+            )
+        workers.append((index, worker_dir, process))
+
+    merged = {
+        "tests_run": 0,
+        "failures": [],
+        "errors": [],
+        "skipped": [],
+        "successful": True,
+        "workers": {},
+    }
+    for index, worker_dir, process in workers:
+        returncode = process.wait()
+        logging.debug(f"Worker {index} finished with {returncode=}")
+        with open(f"{worker_dir}/stdout.txt") as infile:
+            print(f"===== worker {index} =====\n{infile.read()}", flush=True)
+        try:
+            with open(f"{worker_dir}/result.json") as infile:
+                result = json.load(infile)
+        except FileNotFoundError:
+            # The worker crashed before any test result was available.
+            result = {"errors": [f"worker_{index}"], "successful": False}
+        for key in ("failures", "errors", "skipped"):
+            merged[key].extend(result.get(key, []))
+        merged["tests_run"] += result.get("tests_run", 0)
+        merged["successful"] &= result["successful"] and returncode == 0
+        merged["workers"][index] = worker_dir
+
+    with open(f"{args.debug_dir}/result.json", "w") as outfile:
+        json.dump(merged, outfile, indent=4)
+    print(f"Ran {merged['tests_run']} tests in {len(workers)} workers")
+    for key in ("failures", "errors"):
+        for test_id in merged[key]:
+            print(f"{key[:-1].upper()}: {test_id}")
+    print(
+        f"{'OK' if merged['successful'] else 'FAILED'} "
+        f"(failures={len(merged['failures'])}, errors={len(merged['errors'])}, "
+        f"skipped={len(merged['skipped'])})"
+    )
+    sys.exit(0 if merged["successful"] else 1)
+
+
 def run_tests(args):
     # TODO: Is there a better way to pass the debug dir to the tests?
     os.environ["TEST_DEBUG_DIR"] = args.debug_dir
+    os.environ["TEST_HISTORY_DB"] = os.path.abspath(args.history)
+    os.environ["TEST_RESET"] = args.reset
+    os.environ["JOPLIN_API_SETUP"] = args.api_setup
+    os.environ["TEST_SCREENSHOT_FORMAT"] = args.screenshot_format
+    os.environ["TEST_INPUT_BACKEND"] = args.input_backend
+    os.environ["TEST_PERF_SIZES"] = ",".join(map(str, args.perf_sizes))
+    os.environ["TEST_PERF_SAMPLES"] = str(args.perf_samples)
+    os.environ["TEST_PERF_NOTEBOOKS"] = str(args.perf_notebooks)
+    os.environ["TEST_PERF_SCROLL_SPEEDS"] = ",".join(
+        map(str, args.perf_scroll_speeds)
+    )
+    if args.profile:
+        os.environ["TEST_PROFILE"] = "1"
+    if args.cdp_backend:
+        os.environ["JOPLIN_CDP_BACKEND"] = "1"
+    if args.extract_appimage:
+        os.environ["JOPLIN_EXTRACT_APPIMAGE"] = "1"
+    recording = (
+        SegmentedRecording(path=f"{args.debug_dir}/failures")
+        if args.record_failures_only
+        else Recording(path=f"{args.debug_dir}/output.mp4")
+    )
     with optional(not args.no_xvfb, Xvfb(width=1920, height=1080)), optional(
-        not args.no_recording, Recording(path=f"{args.debug_dir}/output.mp4")
+        not args.no_recording, recording
     ):
         # The driver should be started in the xvfb context.
         import driver  # pylint: disable=import-outside-toplevel
@@ -122,12 +347,24 @@ def run_tests(args):
         try:
             runner = unittest.TextTestRunner(verbosity=args.verbosity)
             if args.testname is None:
-                suite = unittest.defaultTestLoader.discover(".")
+                suite = unittest.defaultTestLoader.discover(TEST_DIR)
             else:
                 suite = unittest.TestSuite()
-                suite.addTests(unittest.TestLoader().loadTestsFromName(args.testname))
+                suite.addTests(unittest.TestLoader().loadTestsFromNames(args.testname))
             result = runner.run(suite)
+            write_result(result, f"{args.debug_dir}/result.json")
+            if args.profile:
+                hotspots = profiling.profiler.hotspots()
+                print(hotspots)
+                with open(f"{args.debug_dir}/hotspots.txt", "w") as outfile:
+                    outfile.write(hotspots)
         finally:
+            # Write the remaining artifacts of failed tests.
+            capture.pool.flush()
+            # The tests import "base", which starts the log collector.
+            base = sys.modules.get("base")
+            if base is not None:
+                base.log_collector.stop()
             driver.driver.quit()
             driver.chromedriver_service.stop()
             sys.exit(0 if result is not None and result.wasSuccessful() else 1)
@@ -138,7 +375,10 @@ def main():
     os.makedirs(args.debug_dir, exist_ok=True)
     configure_logging(args.debug_dir)
     logging.debug(f"CLI arguments: {args}")
-    run_tests(args)
+    if args.workers > 1:
+        run_workers(args)
+    else:
+        run_tests(args)
 
 
 if __name__ == "__main__":
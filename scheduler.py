@@ -0,0 +1,29 @@
+"""Distribute test classes to workers by their predicted cost."""
+
+import heapq
+from typing import Dict, List, Sequence
+
+
+def plan_naive(test_classes: Sequence[str], workers: int) -> List[List[str]]:
+    """Distribute the test classes round-robin in file order."""
+    return [list(test_classes[i::workers]) for i in range(workers)]
+
+
+def plan_balanced(costs: Dict[str, float], workers: int) -> List[List[str]]:
+    """
+    Longest processing time first: Assign the most expensive remaining test class
+    to the least loaded worker. Each shard starts with its longest class.
+    """
+    shards: List[List[str]] = [[] for _ in range(workers)]
+    # (load, index) of each worker. The index breaks ties deterministically.
+    loads = [(0.0, index) for index in range(workers)]
+    for test_class in sorted(costs, key=lambda name: (-costs[name], name)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(test_class)
+        heapq.heappush(loads, (load + costs[test_class], index))
+    return shards
+
+
+def makespan(shards: List[List[str]], costs: Dict[str, float]) -> float:
+    """Predicted duration of the slowest shard."""
+    return max(sum(costs[test_class] for test_class in shard) for shard in shards)
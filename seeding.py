@@ -0,0 +1,230 @@
+"""Seed test data concurrently through the data API."""
+
+import concurrent.futures
+import dataclasses
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+@dataclasses.dataclass
+class NoteSpec:
+    """Represents a note or todo. Tags are referenced by their title."""
+
+    title: str
+    body: str = ""
+    is_todo: bool = False
+    tags: Sequence[str] = ()
+
+
+@dataclasses.dataclass
+class NotebookSpec:
+    """Represents a notebook with its notes and sub-notebooks."""
+
+    title: str
+    notes: Sequence[NoteSpec] = ()
+    children: Sequence["NotebookSpec"] = ()
+
+
+@dataclasses.dataclass
+class FixtureSpec:
+    """Declarative description of the data to seed."""
+
+    notebooks: Sequence[NotebookSpec] = ()
+    # Tags without any note. Tags of the notes are created automatically.
+    tags: Sequence[str] = ()
+
+
+@dataclasses.dataclass
+class SeedResult:
+    """IDs of the created items. Notebooks are keyed by their title path."""
+
+    notebooks: Dict[str, str] = dataclasses.field(default_factory=dict)
+    notes: List[str] = dataclasses.field(default_factory=list)
+    tags: Dict[str, str] = dataclasses.field(default_factory=dict)
+    requests: int = 0
+    duration: float = 0.0
+
+
+def new_id() -> str:
+    # Joplin IDs are 32 hex characters. Creating them locally avoids dependencies
+    # between the requests.
+    return uuid.uuid4().hex
+
+
+class Seeder:
+    """Sends the requests through a keep-alive connection pool."""
+
+    def __init__(self, url: str, token: str, concurrency: int = 8, retries: int = 3):
+        self.url = url
+        self.token = token
+        self.concurrency = concurrency
+        self.retries = retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=concurrency,
+            # The clipper server may reset connections when being overloaded.
+            # With the default methods, a POST is only retried if it wasn't sent.
+            max_retries=Retry(
+                total=retries,
+                backoff_factor=0.1,
+                status_forcelist=(500, 502, 503, 504),
+            ),
+        )
+        self.session.mount("http://", adapter)
+
+    def get(self, path: str) -> requests.Response:
+        return self.session.get(
+            f"{self.url}{path}", params={"token": self.token}, timeout=30
+        )
+
+    def post(self, path: str, data: dict, applied: Optional[Callable[[], bool]] = None):
+        """
+        Create an item. After a server error or a lost response, the POST may have
+        been applied already. Joplin rejects a second item with the same ID, so it's
+        only repeated if "applied()" says it wasn't.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(
+                    f"{self.url}{path}",
+                    params={"token": self.token},
+                    json=data,
+                    timeout=30,
+                )
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return
+                error = requests.HTTPError(
+                    f"{response.status_code} for {path}", response=response
+                )
+            except (requests.ConnectionError, requests.Timeout) as exception:
+                error = exception
+            if applied is None or attempt == self.retries:
+                raise error
+            if applied():
+                logging.debug(f"Seeding: {path} was applied despite {error}")
+                return
+            logging.debug(f"Seeding: retry {path} after {error}")
+            time.sleep(0.1 * 2**attempt)
+
+    def create(self, path: str, data: dict):
+        """Create an item with a given ID. It exists, if the ID can be read."""
+        self.post(
+            path,
+            data,
+            applied=lambda: self.get(f"{path}/{data['id']}").status_code == 200,
+        )
+
+    def link(self, tag_id: str, note_id: str):
+        def applied():
+            response = self.get(f"/notes/{note_id}/tags?fields=id&limit=100")
+            response.raise_for_status()
+            return tag_id in [tag["id"] for tag in response.json()["items"]]
+
+        self.post(f"/tags/{tag_id}/notes", {"id": note_id}, applied=applied)
+
+    def run_all(self, calls: Iterable[Callable[[], None]]) -> int:
+        """
+        Run the calls concurrently. Only a limited amount of calls is queued,
+        so that the server isn't flooded and the memory usage is constant.
+        """
+        in_flight = threading.BoundedSemaphore(2 * self.concurrency)
+        futures = set()
+        count = 0
+        with concurrent.futures.ThreadPoolExecutor(self.concurrency) as executor:
+            for call in calls:
+                in_flight.acquire()  # pylint: disable=consider-using-with
+                future = executor.submit(call)
+                future.add_done_callback(lambda _: in_flight.release())
+                futures.add(future)
+                count += 1
+                # Fail early and don't keep the finished futures.
+                for finished in [future for future in futures if future.done()]:
+                    futures.remove(finished)
+                    finished.result()
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+        return count
+
+    def seed(self, spec: FixtureSpec) -> SeedResult:
+        """
+        Seed the data in three stages: Notebooks level by level, then notes and
+        tags, then the links between notes and tags.
+        """
+        start_time = time.time()
+        result = SeedResult()
+        notes = []  # tuples of (note ID, parent ID, spec)
+
+        level = [(notebook, "", "") for notebook in spec.notebooks]
+        while level:
+            next_level = []
+            calls = []
+            for notebook, parent_path, parent_id in level:
+                id_ = new_id()
+                path = (
+                    f"{parent_path}/{notebook.title}" if parent_path else notebook.title
+                )
+                result.notebooks[path] = id_
+                data = {"id": id_, "title": notebook.title, "parent_id": parent_id}
+                calls.append(lambda data=data: self.create("/folders", data))
+                notes.extend((new_id(), id_, note) for note in notebook.notes)
+                next_level.extend((child, path, id_) for child in notebook.children)
+            result.requests += self.run_all(calls)
+            level = next_level
+
+        tag_titles = list(spec.tags)
+        for _, _, note in notes:
+            tag_titles.extend(note.tags)
+        result.tags = {title: new_id() for title in dict.fromkeys(tag_titles)}
+        result.notes = [note_id for note_id, _, _ in notes]
+
+        def items():
+            for title, id_ in result.tags.items():
+                yield lambda id_=id_, title=title: self.create(
+                    "/tags", {"id": id_, "title": title}
+                )
+            for note_id, parent_id, note in notes:
+                data = {
+                    "id": note_id,
+                    "parent_id": parent_id,
+                    "title": note.title,
+                    "body": note.body,
+                    "is_todo": int(note.is_todo),
+                }
+                yield lambda data=data: self.create("/notes", data)
+
+        result.requests += self.run_all(items())
+
+        def links():
+            for note_id, _, note in notes:
+                for title in note.tags:
+                    yield lambda tag_id=result.tags[title], note_id=note_id: self.link(
+                        tag_id, note_id
+                    )
+
+        result.requests += self.run_all(links())
+
+        result.duration = time.time() - start_time
+        logging.debug(f"Seeding: {result.requests} requests in {result.duration:.3f} s")
+        return result
+
+
+# Keep the connection pools alive between the test classes.
+_seeders: Dict[tuple, Seeder] = {}
+
+
+def seed(api, spec: FixtureSpec, concurrency: int = 8) -> SeedResult:
+    """Seed the data with the URL and token of a joppy API object."""
+    key = (api.url, api.token, concurrency)
+    if key not in _seeders:
+        _seeders[key] = Seeder(api.url, api.token, concurrency=concurrency)
+    return _seeders[key].seed(spec)
@@ -0,0 +1,92 @@
+"""
+Snapshots of the joplin profile. Restoring a snapshot resets the app state
+independently of the amount of data that was created meanwhile.
+"""
+
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+
+
+def clone_file(source: str, destination: str):
+    """Copy a file. Use a copy-on-write clone, if the filesystem supports it."""
+    try:
+        subprocess.run(
+            ["cp", "--reflink=auto", source, destination],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        # "cp" is not available or doesn't support "--reflink".
+        shutil.copyfile(source, destination)
+
+
+def link_tree(source: str, destination: str):
+    """
+    Copy a directory by hardlinks. This is only safe for files that get replaced,
+    but never modified, like the joplin resources.
+    """
+
+    def link_or_copy(source_file, destination_file):
+        try:
+            os.link(source_file, destination_file)
+        except OSError:
+            # For example when crossing filesystems.
+            shutil.copy2(source_file, destination_file)
+
+    shutil.copytree(source, destination, copy_function=link_or_copy)
+
+
+class ProfileSnapshot:
+    """Snapshot of the database and the resources of a profile."""
+
+    DATABASE = "database.sqlite"
+    RESOURCES = "resources"
+
+    def __init__(self, profile_dir: str, snapshot_dir: str):
+        self.profile_dir = profile_dir
+        self.snapshot_dir = snapshot_dir
+        self.taken = False
+
+    def take(self):
+        """Take a snapshot. The app can keep running."""
+        logging.debug(f"Snapshot: take {self.profile_dir} to {self.snapshot_dir}")
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+        os.makedirs(self.snapshot_dir)
+
+        # The backup API creates a consistent copy, even while the database is used.
+        source = sqlite3.connect(f"{self.profile_dir}/{self.DATABASE}")
+        target = sqlite3.connect(f"{self.snapshot_dir}/{self.DATABASE}")
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        resources = f"{self.profile_dir}/{self.RESOURCES}"
+        if os.path.exists(resources):
+            link_tree(resources, f"{self.snapshot_dir}/{self.RESOURCES}")
+        self.taken = True
+
+    def restore(self):
+        """Restore the snapshot. The app has to be stopped."""
+        logging.debug(f"Snapshot: restore {self.snapshot_dir} to {self.profile_dir}")
+        for suffix in ("", "-journal", "-wal", "-shm"):
+            try:
+                os.remove(f"{self.profile_dir}/{self.DATABASE}{suffix}")
+            except FileNotFoundError:
+                pass
+        clone_file(
+            f"{self.snapshot_dir}/{self.DATABASE}",
+            f"{self.profile_dir}/{self.DATABASE}",
+        )
+
+        resources = f"{self.profile_dir}/{self.RESOURCES}"
+        shutil.rmtree(resources, ignore_errors=True)
+        if os.path.exists(f"{self.snapshot_dir}/{self.RESOURCES}"):
+            link_tree(f"{self.snapshot_dir}/{self.RESOURCES}", resources)
+        else:
+            os.makedirs(resources)
@@ -0,0 +1,22 @@
+"""Summary statistics of durations, shared by the measurements and benchmarks."""
+
+import math
+from typing import Dict, List, Sequence
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest rank percentile of sorted values."""
+    return ordered[math.ceil(fraction * len(ordered)) - 1]
+
+
+def percentiles(values: List[float], fractions=(0.5, 0.9, 0.95)) -> Dict[str, float]:
+    """Nearest rank percentiles and the maximum."""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    result = {
+        f"p{round(fraction * 100)}": percentile(ordered, fraction)
+        for fraction in fractions
+    }
+    result["max"] = ordered[-1]
+    return result
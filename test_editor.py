@@ -3,10 +3,10 @@
 from datetime import datetime, timedelta
 
 from parameterized import parameterized
-import pyautogui
 from selenium.webdriver.common.by import By
 
 import base
+import inputs
 import menu
 
 
@@ -79,7 +79,7 @@ class Editor(base.Test):
             toggle_layout_button = toolbar_buttons[2]
             toggle_layout_button.click()
         elif way == "hotkey":
-            pyautogui.hotkey("ctrl", "l")
+            inputs.hotkey("ctrl", "l")
         elif way == "top_menu":
             menu.top(["View", "Toggle editor layout"])
         else:
@@ -5,11 +5,13 @@ import itertools
 import time
 
 from parameterized import parameterized
-import pyautogui
 from selenium.webdriver.common.by import By
 
 import base
+import commands
+import inputs
 import menu
+import seeding
 
 
 class Zoom(enum.Enum):
@@ -20,49 +22,60 @@ class Zoom(enum.Enum):
 
 ZOOM_MAP = {
     "hotkey": {
-        Zoom.IN: lambda: pyautogui.hotkey("ctrl", "shift", "="),
-        Zoom.OUT: lambda: pyautogui.hotkey("ctrl", "-"),
-        Zoom.RESET: lambda: pyautogui.hotkey("ctrl", "0"),
+        Zoom.IN: lambda: inputs.hotkey("ctrl", "shift", "="),
+        Zoom.OUT: lambda: inputs.hotkey("ctrl", "-"),
+        Zoom.RESET: lambda: inputs.hotkey("ctrl", "0"),
     },
     "top_menu": {
         Zoom.IN: lambda: menu.top(["View", "Zoom in"]),
         Zoom.OUT: lambda: menu.top(["View", "Zoom out"]),
         Zoom.RESET: lambda: menu.top(["View", "Actual size"]),
     },
+    "command": {
+        Zoom.IN: lambda: commands.zoom(10),
+        Zoom.OUT: lambda: commands.zoom(-10),
+        Zoom.RESET: lambda: commands.zoom(None),
+    },
 }
 
 GOTO_ANYTHING_MAP = {
-    "hotkey": lambda: pyautogui.hotkey("ctrl", "p"),
-    "top_menu": lambda: menu.top(["Go", "Goto anything"], skip={"Goto anything": 1}),
+    "hotkey": lambda: inputs.hotkey("ctrl", "p"),
+    "top_menu": lambda: menu.top(["Go", "Goto anything"]),
+    "command": lambda: commands.execute("gotoAnything"),
 }
 
 # Order is mixed to don't select the same location twice.
 FOCUS_MAP = {
     "hotkey": {
-        "sidebar": lambda: pyautogui.hotkey("ctrl", "shift", "s"),
-        "note_list": lambda: pyautogui.hotkey("ctrl", "shift", "l"),
-        "note_title": lambda: pyautogui.hotkey("ctrl", "shift", "n"),
-        "note_body": lambda: pyautogui.hotkey("ctrl", "shift", "b"),
+        "sidebar": lambda: inputs.hotkey("ctrl", "shift", "s"),
+        "note_list": lambda: inputs.hotkey("ctrl", "shift", "l"),
+        "note_title": lambda: inputs.hotkey("ctrl", "shift", "n"),
+        "note_body": lambda: inputs.hotkey("ctrl", "shift", "b"),
     },
     "top_menu": {
-        # Skip one entry at the focus selection, because "Forward" is not selectable.
-        "sidebar": lambda: menu.top(["Go", "Focus", "Sidebar"], skip={"Focus": 1}),
-        "note_list": lambda: menu.top(["Go", "Focus", "Note list"], skip={"Focus": 1}),
-        "note_title": lambda: menu.top(
-            ["Go", "Focus", "Note title"], skip={"Focus": 1}
-        ),
-        "note_body": lambda: menu.top(["Go", "Focus", "Note body"], skip={"Focus": 1}),
+        "sidebar": lambda: menu.top(["Go", "Focus", "Sidebar"]),
+        "note_list": lambda: menu.top(["Go", "Focus", "Note list"]),
+        "note_title": lambda: menu.top(["Go", "Focus", "Note title"]),
+        "note_body": lambda: menu.top(["Go", "Focus", "Note body"]),
+    },
+    "command": {
+        "sidebar": lambda: commands.execute("focusElementSideBar"),
+        "note_list": lambda: commands.execute("focusElementNoteList"),
+        "note_title": lambda: commands.execute("focusElementNoteTitle"),
+        "note_body": lambda: commands.execute("focusElementNoteBody"),
     },
 }
 
 TOGGLE_MAP = {
     "sidebar": {
-        "hotkey": lambda: pyautogui.press("f10"),
+        "hotkey": lambda: inputs.press("f10"),
         "top_menu": lambda: menu.top(["View", "Toggle sidebar"]),
+        "command": lambda: commands.execute("toggleSideBar"),
     },
     "notelist": {
-        "hotkey": lambda: pyautogui.press("f11"),
+        "hotkey": lambda: inputs.press("f11"),
         "top_menu": lambda: menu.top(["View", "Toggle note list"]),
+        "command": lambda: commands.execute("toggleNoteList"),
     },
 }
 
@@ -73,12 +86,17 @@ class Go(base.Test):
     base_element_map = None
 
     @classmethod
-    def setUpClass(cls):
-        super().setUpClass()
-        for key in GOTO_ANYTHING_MAP:
-            cls.api.add_note(title=key, content=key)
-        # Needed for "test_goto_anything()".
-        cls.api.add_notebook(title="abc")
+    def fixture(cls):
+        notes = [seeding.NoteSpec(cls.__name__)]
+        # "test_aa_go_back_forward()" expects three notes.
+        notes.extend(seeding.NoteSpec(key, body=key) for key in ("hotkey", "top_menu"))
+        return seeding.FixtureSpec(
+            notebooks=[
+                seeding.NotebookSpec(cls.__name__, notes=notes),
+                # Needed for "test_goto_anything()".
+                seeding.NotebookSpec("abc"),
+            ]
+        )
 
     def setUp(self):
         super().setUp()
@@ -93,9 +111,11 @@ class Go(base.Test):
             self.__class__.base_element_map = {
                 "sidebar": self.sidebar,
                 "note_list": self.notelist,
-                "note_title": self.editor.find_element(By.CLASS_NAME, "title-input"),
-                "note_body": self.editor.find_element(
-                    By.CLASS_NAME, "codeMirrorEditor"
+                "note_title": self.locators.find(
+                    By.CLASS_NAME, "title-input", scope=self.editor
+                ),
+                "note_body": self.locators.find(
+                    By.CLASS_NAME, "codeMirrorEditor", scope=self.editor
                 ),
             }
 
@@ -105,9 +125,7 @@ class Go(base.Test):
     def test_focus(self, way, location):
         FOCUS_MAP[way][location]()
 
-        self.assert_contains(
-            self.base_element_map[location], self.driver.switch_to.active_element
-        )
+        self.assert_focus_within(self.base_element_map[location])
 
     def test_aa_go_back_forward(self):
         # Run first to have a baseline for the coming tests.
@@ -117,33 +135,31 @@ class Go(base.Test):
         notes = self.get_notes()
         self.assertEqual(len(notes), 3)
 
-        def is_selected(element):
+        def selection():
             # Seleniums is_selected() is not usable in this case.
-            return "selected" in element.get_attribute("class")
+            # Get the state of all notes at once.
+            return [note.selected for note in self.list_state().notes]
 
         # Click all three notes to have the selectable backward also when going back.
         for note in notes:
             note.click()
-        self.assertFalse(is_selected(notes[0]))
-        self.assertFalse(is_selected(notes[1]))
-        self.assertTrue(is_selected(notes[2]))
+        self.assertEqual(selection(), [False, False, True])
 
         menu.top(["Go", "Back"])
-        self.assertFalse(is_selected(notes[0]))
-        self.assertTrue(is_selected(notes[1]))
-        self.assertFalse(is_selected(notes[2]))
+        self.assertEqual(selection(), [False, True, False])
 
         menu.top(["Go", "Forward"])
-        self.assertFalse(is_selected(notes[0]))
-        self.assertFalse(is_selected(notes[1]))
-        self.assertTrue(is_selected(notes[2]))
+        self.assertEqual(selection(), [False, False, True])
 
     @parameterized.expand(GOTO_ANYTHING_MAP.keys())
     def test_goto_anything(self, way):
         # TODO: Extend test for tags and notes (slow).
 
         # Select another notebook to ensure goto is working correctly.
-        self.select_random_notebook(exclude=[self.notebook_id])
+        # Selecting isn't tested here, so use the fastest way.
+        commands.execute(
+            "openFolder", self.mirror.random_notebook(exclude=[self.notebook_id])
+        )
 
         time.sleep(0.1)  # TODO: Small delay, because else the menu doesn't open.
         GOTO_ANYTHING_MAP[way]()
@@ -162,7 +178,9 @@ class View(base.Test):
         # Execute last, since it makes the element references stale.
         # TODO: Only a smoke test. The text is language specific.
         menu.top(["View", "Change application layout"])
-        pyautogui.press("esc")
+        inputs.press("esc")
+        # The layout may be rendered again. Locate all elements again.
+        base.locator_cache.invalidate()
 
     @parameterized.expand(
         itertools.product(TOGGLE_MAP.keys(), TOGGLE_MAP["sidebar"].keys())
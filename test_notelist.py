@@ -5,12 +5,12 @@ import itertools
 import logging
 
 from parameterized import parameterized
-import pyautogui
 import pyperclip
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 
 import base
+import inputs
 import menu
 
 
@@ -46,7 +46,7 @@ class Note(base.Test):
             add_note_button.click()
         elif way == "hotkey":
             # ActionChains doesn't work.
-            pyautogui.hotkey("ctrl", "t" if todo else "n")
+            inputs.hotkey("ctrl", "t" if todo else "n")
         elif way == "top_menu":
             menu.top(["File", "New to-do" if todo else "New note"])
         else:
@@ -73,13 +73,11 @@ class Note(base.Test):
     @parameterized.expand(("hotkey", "right_click"))
     def test_delete_note(self, way):
         self.skipTest("TODO: Running this test causes multiple tests to fail.")
-        # TODO: check if correct note got deleted
 
-        note_element, _, _, _ = self.select_random_note(exclude=[self.note_id])
-        note_count = self.get_note_count_api()
+        note_element, note_id, _, _ = self.select_random_note(exclude=[self.note_id])
         self.delete_note(note_element, way=way)
         self.wait_for(
-            lambda: self.get_note_count_api() == note_count - 1,
+            lambda: not self.note_exists_api(note_id),
             message=f"Deleting note by {way} failed.",
         )
 
@@ -0,0 +1,227 @@
+"""
+Latency of the core interactions with large profiles. Only executed, if profile
+sizes are given, for example by "run_tests.py --perf-sizes 1000 10000".
+"""
+
+import json
+import logging
+import os
+import random
+from typing import Dict, List
+import unittest
+
+from selenium.webdriver.common.by import By
+
+import base
+import framerate
+import latency
+import seeding
+import stats
+
+# Amount of notes per profile.
+SIZES = [int(size) for size in os.getenv("TEST_PERF_SIZES", "").split(",") if size]
+# Measurements per interaction.
+SAMPLES = int(os.getenv("TEST_PERF_SAMPLES", "10"))
+# The notes are distributed evenly over the notebooks.
+NOTEBOOKS = int(os.getenv("TEST_PERF_NOTEBOOKS", "20"))
+# Scroll speeds in px/s.
+SCROLL_SPEEDS = [
+    int(speed)
+    for speed in os.getenv("TEST_PERF_SCROLL_SPEEDS", "1000,5000").split(",")
+    if speed
+]
+BODY_PREFIX = "Body of"
+
+
+def notebook_title(index: int) -> str:
+    return f"perf {index}"
+
+
+def note_prefix(notebook: str) -> str:
+    # Separated, so that "perf 1" isn't a prefix of the notes in "perf 10".
+    return f"{notebook} /"
+
+
+class Performance(base.Test):
+    size = 0
+    durations: Dict[str, List[float]] = {}
+    scrolls: Dict[str, dict] = {}
+    # Selected notebook. Clicking it again wouldn't render anything.
+    notebook_id = None
+
+    @classmethod
+    def setUpClass(cls):
+        if not cls.size:
+            raise unittest.SkipTest("No profile size given.")
+        cls.durations = {}
+        cls.scrolls = {}
+        cls.notebook_id = None
+        super().setUpClass()
+        cls.prefixes = {
+            id_: note_prefix(title) for title, id_ in cls.seeded.notebooks.items()
+        }
+        # The notes are seeded notebook by notebook. "All notes" shows the newest
+        # first, so only the later notebooks are visible there.
+        cls.later_notebooks = [
+            cls.seeded.notebooks[notebook_title(index)]
+            for index in range(NOTEBOOKS // 2, NOTEBOOKS)
+        ]
+
+    @classmethod
+    def fixture(cls):
+        notebooks = []
+        for index in range(NOTEBOOKS):
+            title = notebook_title(index)
+            notes = []
+            for number in range(index, cls.size, NOTEBOOKS):
+                note = f"{note_prefix(title)} note {number}"
+                notes.append(seeding.NoteSpec(note, body=f"{BODY_PREFIX} {note}"))
+            notebooks.append(seeding.NotebookSpec(title, notes=notes))
+        return seeding.FixtureSpec(notebooks=notebooks)
+
+    @classmethod
+    def tearDownClass(cls):
+        report = {
+            "latency": {
+                interaction: {
+                    "samples": len(durations),
+                    **stats.percentiles(durations),
+                }
+                for interaction, durations in cls.durations.items()
+            },
+            "scroll": cls.scrolls,
+        }
+        logging.info(f"Performance: {cls.size} notes: {report}")
+        print(f"\n{cls.size} notes:")
+        for interaction, row in report["latency"].items():
+            print(
+                f"{interaction:10} | samples {row['samples']} | "
+                + " | ".join(
+                    f"{key} {value:7.1f} ms"
+                    for key, value in row.items()
+                    if key != "samples"
+                )
+            )
+        for name, row in cls.scrolls.items():
+            print(
+                f"{name:25} | {row['frames']:4} frames | "
+                f"{row['dropped_frames']:4} dropped | "
+                f"p95 {row['p95_frame_time'] or 0:6.1f} ms | "
+                f"{row['long_tasks']} long tasks | {row['max_nodes']:5} nodes"
+            )
+        debug_dir = os.getenv("TEST_DEBUG_DIR")
+        if debug_dir is not None:
+            with open(f"{debug_dir}/performance_{cls.size}.json", "w") as outfile:
+                json.dump(report, outfile, indent=2)
+        super().tearDownClass()
+
+    def measure(
+        self, interaction: str, target: str, expected, click, record: bool = True
+    ):
+        """
+        Click and wait until the result is rendered. Store the time, if it should
+        be recorded.
+        """
+        latency.arm(self.driver, interaction, target, expected)
+        click()
+        duration = latency.collect(self.driver)
+        logging.debug(f"Performance: {interaction} took {duration:.1f} ms")
+        if record:
+            self.durations.setdefault(interaction, []).append(duration)
+
+    def open_notebook(self, exclude=()) -> str:
+        """
+        Select a random notebook, other than the selected one, and wait until
+        its notes are rendered.
+        """
+
+        def click():
+            _, self.__class__.notebook_id = self.select_random_notebook(
+                exclude=[*exclude, self.notebook_id]
+            )
+
+        self.measure("notebook", "div[data-folder-id]", self.prefixes, click)
+        return self.notebook_id
+
+    def record_scroll(self, name: str, root: str):
+        """Scroll the list at each speed from the top."""
+        for speed in SCROLL_SPEEDS:
+            try:
+                self.scrolls[f"{name} {speed} px/s"] = framerate.scroll(
+                    self.driver, root, speed
+                )
+            except framerate.FrameRateError as error:
+                self.skipTest(str(error))
+
+    def test_open_notebook(self):
+        for _ in range(SAMPLES):
+            self.open_notebook()
+
+    def test_open_note(self):
+        for _ in range(SAMPLES):
+            notebook_id = self.open_notebook()
+            # The note list is virtual. Only the rendered notes can be clicked.
+            # The selected note wouldn't change anything. Created notes are skipped.
+            selected = self.locators.find(
+                By.CLASS_NAME, "title-input", scope=self.editor
+            ).get_attribute("value")
+            note = random.choice(
+                [
+                    note
+                    for note in self.notelist.find_elements(
+                        By.CSS_SELECTOR, "a[data-id]"
+                    )
+                    if note.text != selected
+                    and note.text.startswith(self.prefixes[notebook_id])
+                ]
+            )
+            self.measure("note", "a[data-id]", BODY_PREFIX, note.click)
+
+    def test_show_all_notes(self):
+        all_notes_button = self.locators.find(
+            By.CLASS_NAME, "all-notes", scope=self.sidebar
+        )
+        for _ in range(SAMPLES):
+            notebook_id = self.open_notebook(exclude=self.later_notebooks)
+            self.measure(
+                "allNotes",
+                ".all-notes",
+                self.prefixes[notebook_id],
+                all_notes_button.click,
+            )
+            self.__class__.notebook_id = None
+
+    def test_new_note(self):
+        for _ in range(SAMPLES):
+            self.open_notebook()
+            new_note_button = self.notelist.find_element(
+                By.CLASS_NAME, "new-note-button"
+            )
+            self.measure("newNote", ".new-note-button", None, new_note_button.click)
+
+    def test_scroll_note_list(self):
+        # A notebook, whose notes aren't at the top of "All notes".
+        notebook_id = self.open_notebook(exclude=self.later_notebooks)
+        self.record_scroll("notebook", ".rli-noteList")
+
+        # Wait until "All notes" replaced the notes of the notebook.
+        self.measure(
+            "allNotes",
+            ".all-notes",
+            self.prefixes[notebook_id],
+            self.locators.find(By.CLASS_NAME, "all-notes", scope=self.sidebar).click,
+            record=False,
+        )
+        self.__class__.notebook_id = None
+        self.record_scroll("all notes", ".rli-noteList")
+
+    def test_scroll_sidebar(self):
+        # Only scrollable with enough notebooks, see "--perf-notebooks".
+        self.record_scroll("sidebar", ".rli-sideBar")
+
+
+# One test class per profile size.
+for _size in SIZES:
+    globals()[f"Performance{_size}"] = type(
+        f"Performance{_size}", (Performance,), {"size": _size}
+    )
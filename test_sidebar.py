@@ -1,22 +1,22 @@
 """Tests for the sidebar on the left."""
 
+import collections
 import logging
 
 from parameterized import parameterized
-import pyautogui
-from selenium.common.exceptions import NoSuchElementException
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 
 import base
+import inputs
 import menu
 
 
 class Sidebar(base.Test):
     def test_synchronise_button(self):
         # TODO: extend
-        self.sidebar.find_element(
-            By.XPATH, "//button/span[contains(@class, 'icon-sync')]"
+        self.locators.find(
+            By.XPATH, "//button/span[contains(@class, 'icon-sync')]", scope=self.sidebar
         )
 
 
@@ -39,20 +39,18 @@ class Notebook(base.Test):
         logging.debug(f"UI: add notebook {name=}, {way=}")
 
         if way == "button":
-            add_notebook_button = self.sidebar.find_element(
-                By.XPATH, "//div[@data-folder-id]/following-sibling::button"
+            add_notebook_button = self.locators.find(
+                By.XPATH,
+                "//div[@data-folder-id]/following-sibling::button",
+                scope=self.sidebar,
             )
             add_notebook_button.click()
         elif way == "right_click":
             if parent is None:
                 # right click on the notebooks title at top
-                notebook_title = self.driver.find_element(
-                    By.XPATH, "//div[@data-folder-id]"
-                )
-
                 # first option of dropdown
                 # TODO: Find a way to abstract all menus.
-                ActionChains(self.driver).context_click(notebook_title).perform()
+                ActionChains(self.driver).context_click(self.notebooks_title).perform()
                 menu.choose_entry(1)
             else:
                 # right click on the specified parent notebook
@@ -136,40 +134,30 @@ class Notebook(base.Test):
     def test_note_count_label(self):
         self.skipTest("TODO: Resizing doesn't work. Is there a reliable way?")
         # Resize the sidebar to make all labels visible.
-        sidebar_resize = self.sidebar.find_element(
-            By.XPATH, "//div[contains(@style, 'col-resize')]"
+        sidebar_resize = self.locators.find(
+            By.XPATH, "//div[contains(@style, 'col-resize')]", scope=self.sidebar
         )
         ActionChains(self.driver).click_and_hold(sidebar_resize).move_by_offset(
             100, 0
         ).perform()
 
-        def get_note_count_by_label(notebook) -> int:
-            try:
-                note_label = notebook.find_element(By.CLASS_NAME, "note-count-label")
-                self.assertTrue(note_label.is_displayed())
-                actual = int(note_label.text)
-            except (NoSuchElementException, ValueError):
-                actual = 0
-            return actual
+        def labels_match_api() -> bool:
+            # Compare all notebooks at once. Empty notebooks don't have a label.
+            notes = self.api.get_all_notes(fields="parent_id")
+            expected = collections.Counter(note.parent_id for note in notes)
+            return all(
+                (notebook.note_count or 0) == expected[notebook.id]
+                for notebook in self.list_state().notebooks
+            )
 
         # Add a note to have at least one notebook with content.
         self.api.add_note(title=self._testMethodName)
-        notebooks = self.get_notebooks().items
-        for notebook in notebooks:
-            # Sometimes the note count needs time to update.
-            self.wait_for(
-                lambda: len(
-                    self.api.get_all_notes(
-                        notebook_id=notebook.get_attribute("data-folder-id")
-                    )
-                )
-                == get_note_count_by_label(notebook),
-                timeout=3,
-            )
+        # Sometimes the note count needs time to update.
+        self.wait_for(labels_match_api, timeout=3)
 
     def test_notebook_collapsing(self):
-        notebooks_div = self.sidebar.find_element(
-            By.XPATH, "//div[starts-with(@class, 'folders')]"
+        notebooks_div = self.locators.find(
+            By.XPATH, "//div[starts-with(@class, 'folders')]", scope=self.sidebar
         )
         self.assertTrue(notebooks_div.is_displayed())
         self.notebooks_title.click()
@@ -178,7 +166,9 @@ class Notebook(base.Test):
         self.assertTrue(notebooks_div.is_displayed())
 
     def test_show_all_notes(self):
-        all_notes_button = self.sidebar.find_element(By.CLASS_NAME, "all-notes")
+        all_notes_button = self.locators.find(
+            By.CLASS_NAME, "all-notes", scope=self.sidebar
+        )
         all_notes_button.click()
         self.wait_for(lambda: len(self.get_notes()) == self.get_note_count_api())
 
@@ -199,7 +189,7 @@ class Notebook(base.Test):
         # right click -> export note or notebook
         ActionChains(self.driver).context_click(self.notebook).perform()
         menu.choose_entry(4)
-        pyautogui.press("right")
+        inputs.press("right")
         menu.choose_entry(3)
 
         # doc: https://github.com/laurent22/joplin#exporting
@@ -220,10 +210,12 @@ class Tag(base.Test):
         logging.debug(f"UI: add tag {name=}, {way=}")
 
         if way == "bottom_bar":
-            bottom_bar = self.editor.find_element(By.XPATH, "//div[@class='tag-bar']/a")
+            bottom_bar = self.locators.find(
+                By.XPATH, "//div[@class='tag-bar']/a", scope=self.editor
+            )
             bottom_bar.click()
         elif way == "hotkey":
-            pyautogui.hotkey("ctrl", "alt", "t")
+            inputs.hotkey("ctrl", "alt", "t")
         elif way == "right_click":
             ActionChains(self.driver).context_click(self.note).perform()
             menu.choose_entry(1)
@@ -282,10 +274,10 @@ class Tag(base.Test):
         self.assertEqual(renamed_tag.title, new_name)
 
     def test_tag_collapsing(self):
-        tag_title = self.sidebar.find_element(
-            By.XPATH, "//div/i[contains(@class, 'icon-tags')]/.."
+        tag_title = self.locators.find(
+            By.XPATH, "//div/i[contains(@class, 'icon-tags')]/..", scope=self.sidebar
         )
-        tag_div = self.sidebar.find_element(By.CLASS_NAME, "tags")
+        tag_div = self.locators.find(By.CLASS_NAME, "tags", scope=self.sidebar)
         self.assertTrue(tag_div.is_displayed())
         tag_title.click()
         self.assertFalse(tag_div.is_displayed())
@@ -0,0 +1,85 @@
+"""
+Enter text into inputs. Setting the value directly takes a single request,
+independent of the length of the old and the new text.
+"""
+
+import logging
+import time
+from typing import Optional
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+import wait
+
+
+# React tracks the value of controlled inputs. Use the native setter and
+# dispatch an input event, so that the change is noticed by "onChange".
+# A controlled input, that doesn't take the value, reverts it when rendering. So
+# the value is read back after the next frame.
+SET_VALUE_SCRIPT = """
+const [input, value, done] = arguments;
+const prototype = input instanceof HTMLTextAreaElement
+  ? HTMLTextAreaElement.prototype
+  : HTMLInputElement.prototype;
+Object.getOwnPropertyDescriptor(prototype, "value").set.call(input, value);
+input.dispatchEvent(new Event("input", { bubbles: true }));
+input.focus();
+requestAnimationFrame(() => setTimeout(() => done(input.value), 0));
+"""
+
+
+def set_value(driver, element, text: str) -> bool:
+    """Replace the value in one step. Return whether the value was taken."""
+    return driver.execute_async_script(SET_VALUE_SCRIPT, element, text) == text
+
+
+def type_text(element, text: str):
+    """
+    Select the old value and type the new one by key events. Only needed by inputs
+    that react on the single keys, like autocompletion.
+    """
+    element.send_keys(Keys.CONTROL, "a", Keys.NULL, Keys.BACKSPACE, text)
+
+
+def enter_text(driver, element, text: str, typing: bool = False):
+    """Replace the value of an input. Type only if needed."""
+    if typing:
+        type_text(element, text)
+    elif not set_value(driver, element, text):
+        logging.debug("Text entry: setting the value failed. Type it instead.")
+        type_text(element, text)
+
+
+def fill_modal_dialog(
+    driver,
+    input_: str,
+    confirm_by_button: bool = False,
+    notebook: bool = False,
+    tag: bool = False,
+    wait_before_confirm: Optional[float] = None,
+    typing: bool = False,
+):
+    """Fill out and confirm a modal dialog with one input."""
+    # There are two modal dialogs. Chose the one that is displayed.
+    dialog = wait.wait_for_element(
+        driver,
+        By.XPATH,
+        "//div[@class='dialog-root']"
+        if notebook
+        else "//div[@class='modal-layer'][contains(@style, 'display: flex')]",
+        condition="visible",
+    )
+    input_element = dialog.find_element(By.TAG_NAME, "input")
+    # The tag input autocompletes by key events.
+    enter_text(driver, input_element, input_, typing=typing or tag)
+    if wait_before_confirm is not None:
+        time.sleep(wait_before_confirm)
+    if tag:
+        input_element.send_keys(Keys.ENTER)
+    if confirm_by_button:
+        # Assume the first button is to confirm.
+        confirm_button = dialog.find_element(By.TAG_NAME, "button")
+        confirm_button.click()
+    else:
+        input_element.send_keys(Keys.ENTER)
@@ -0,0 +1,16 @@
+"""
+Versions of the external binaries. They are kept separate from "driver",
+because importing "driver" starts the app.
+"""
+
+JOPLIN_VERSION = "2.9.17"
+
+# Electron app uses chrome 102.0.5005.61. See "driver.download_chromedriver()".
+CHROMEDRIVER_VERSION = "102.0.5005.61"
+
+# Checksums of the downloads. They aren't pinned yet, so the first download is
+# trusted: Its checksum is recorded in the cache and only later reads of the
+# cache are checked against it. It is logged, so that it can be pinned here. A
+# pinned checksum replaces a different, recorded one.
+JOPLIN_SHA256 = None
+CHROMEDRIVER_SHA256 = None
@@ -0,0 +1,178 @@
+"""
+Wait for elements inside the renderer instead of polling via webdriver.
+The condition is sent once and resolves as soon as the DOM satisfies it.
+"""
+
+import logging
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# Default script timeout of the webdriver protocol in seconds.
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+# Conditions, equivalent to the corresponding expected conditions of selenium.
+CONDITIONS = {
+    "present": EC.presence_of_element_located,
+    "visible": EC.visibility_of_element_located,
+    "clickable": EC.element_to_be_clickable,
+}
+
+WAIT_SCRIPT = """
+const [strategy, locator, condition, timeout, done] = arguments;
+
+function find() {
+    switch (strategy) {
+        case "xpath":
+            return document.evaluate(
+                locator, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+            ).singleNodeValue;
+        case "class name":
+            return document.getElementsByClassName(locator)[0] || null;
+        case "tag name":
+            return document.getElementsByTagName(locator)[0] || null;
+        case "css selector":
+            return document.querySelector(locator);
+        case "id":
+            return document.getElementById(locator);
+        case "name":
+            return document.getElementsByName(locator)[0] || null;
+    }
+    return null;
+}
+
+function isVisible(element) {
+    // Similar to the "isDisplayed" atom of selenium.
+    const style = window.getComputedStyle(element);
+    if (style.visibility === "hidden" || parseFloat(style.opacity) === 0) {
+        return false;
+    }
+    const rect = element.getBoundingClientRect();
+    return element.getClientRects().length > 0 && rect.width > 0 && rect.height > 0;
+}
+
+function check() {
+    const element = find();
+    if (element === null) {
+        return null;
+    }
+    if (condition === "present") {
+        return element;
+    }
+    if (!isVisible(element)) {
+        return null;
+    }
+    if (condition === "clickable" && element.disabled) {
+        return null;
+    }
+    return element;
+}
+
+const initial = check();
+if (initial !== null) {
+    done(initial);
+    return;
+}
+
+let finished = false;
+let frameRequested = false;
+const observer = new MutationObserver(checkNextFrame);
+const timer = setTimeout(() => finish(check()), timeout * 1000);
+
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(result);
+}
+
+function checkNextFrame() {
+    // Check at most once per frame, regardless of the amount of mutations.
+    if (finished || frameRequested) {
+        return;
+    }
+    frameRequested = true;
+    requestAnimationFrame(() => {
+        frameRequested = false;
+        const result = check();
+        if (result !== null) {
+            finish(result);
+        } else if (condition !== "present") {
+            // Visibility can change without mutation, for example by a transition.
+            checkNextFrame();
+        }
+    });
+}
+
+observer.observe(document, {
+    subtree: true, childList: true, attributes: true, characterData: true
+});
+if (condition !== "present") {
+    checkNextFrame();
+}
+"""
+
+SUPPORTED_STRATEGIES = (
+    By.XPATH,
+    By.CLASS_NAME,
+    By.TAG_NAME,
+    By.CSS_SELECTOR,
+    By.ID,
+    By.NAME,
+)
+
+# Script timeout of each driver. Only changed if a longer timeout is needed.
+_script_timeouts = {}
+
+
+def wait_for_element(
+    driver, by_, locator: str, condition: str = "present", timeout: float = 1
+):
+    """Wait until an element satisfies the condition and return it."""
+    if by_ not in SUPPORTED_STRATEGIES:
+        # Fall back to polling, but with a shorter interval than the default.
+        return WebDriverWait(driver, timeout, poll_frequency=0.05).until(
+            CONDITIONS[condition]((by_, locator))
+        )
+
+    # The script has to time out later than the wait.
+    if _script_timeouts.get(id(driver), DEFAULT_SCRIPT_TIMEOUT) <= timeout:
+        driver.set_script_timeout(timeout + 1)
+        _script_timeouts[id(driver)] = timeout + 1
+
+    element = driver.execute_async_script(WAIT_SCRIPT, by_, locator, condition, timeout)
+    if element is None:
+        logging.debug(f"Wait: {condition} {by_}={locator} timed out")
+        raise TimeoutException(
+            f"Element {by_}={locator} not {condition} after {timeout} s."
+        )
+    return element
+
+
+def wait_for(
+    func,
+    *args,
+    timeout: int = 1,
+    interval: float = 0.1,
+    initial_delay: bool = False,
+    message: str = "",
+    **kwargs,
+):
+    """Poll a function until it returns something truthy."""
+    # https://stackoverflow.com/a/2785908/7410886
+    mustend = time.time() + timeout
+    if not initial_delay:
+        if func(*args, **kwargs):
+            return
+    while time.time() < mustend:
+        if func(*args, **kwargs):
+            return
+        time.sleep(interval)
+    raise TimeoutError(message)